@@ -1,49 +1,322 @@
 import os
 import json
+import shlex
+import signal
+import hashlib
 import asyncio
-import subprocess
+from dotenv import load_dotenv, find_dotenv
 from utils.terminal_utils import TerminalLogger
+from utils.readiness import wait_until
+from utils.github_utils import (
+    github_repo_exists,
+    github_branch_exists,
+    github_pages_ready,
+)
+
+load_dotenv(find_dotenv(), override=True)
+
+# Seconds a deployment step may run before it is killed
+DEPLOY_STEP_TIMEOUT = float(os.getenv("DEPLOY_STEP_TIMEOUT", 120))
+# Seconds to keep checking whether a newly enabled Pages site is being served
+PAGES_READY_TIMEOUT = float(os.getenv("PAGES_READY_TIMEOUT", 900))
 
 # Load deployment commands
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 with open(os.path.join(BASE_DIR, "deployment_commands.json"), "r") as file:
     commands = json.load(file)
+with open(os.path.join(BASE_DIR, "deployment_commands_incremental.json"), "r") as file:
+    incremental_commands = json.load(file)
+
+# Content hashes of the last deployed tree, kept inside .git so it is never pushed
+MANIFEST_PATH = os.path.join(".git", "deploy-manifest.json")
+
+# Keeps background Pages watchers referenced until they finish
+_watchers = set()
+
+
+class DeploymentError(Exception):
+    pass
+
+
+async def _stream_lines(stream, log_type: str, lines: list):
+    """Forward a subprocess stream to the terminal line by line."""
+    while True:
+        line = await stream.readline()
+        if not line:
+            break
+        text = line.decode(errors="replace").rstrip()
+        lines.append(text)
+        if text:
+            await TerminalLogger.log(log_type, "deployment", text)
+
+
+def _kill(process):
+    """Kill the shell and everything it started."""
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except ProcessLookupError:
+        pass
+
+
+async def run_command(command: str, cwd: str, timeout: float = DEPLOY_STEP_TIMEOUT):
+    """
+    Run a shell command without blocking the event loop, streaming its output
+    to the terminal as it is produced. Returns the combined output.
+    """
+    process = await asyncio.create_subprocess_shell(
+        command,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=cwd,
+        start_new_session=True,
+    )
+    output = []
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(
+                _stream_lines(process.stdout, "info", output),
+                _stream_lines(process.stderr, "info", output),
+                process.wait(),
+            ),
+            timeout,
+        )
+    except asyncio.TimeoutError:
+        _kill(process)
+        await process.wait()
+        raise DeploymentError(f"Command '{command}' timed out after {timeout}s")
+    except asyncio.CancelledError:
+        _kill(process)
+        raise
+
+    if process.returncode != 0:
+        raise DeploymentError(
+            f"Command '{command}' exited with code {process.returncode}:\n"
+            + "\n".join(output[-20:])
+        )
+    return "\n".join(output)
+
+
+async def run_steps(
+    steps: list,
+    cwd: str,
+    replacements: dict,
+    conditions: dict = None,
+    completed: set = None,
+    on_status=None,
+) -> bool:
+    """
+    Run deployment steps as a DAG: every step starts as soon as the steps in
+    its "depends_on" list have succeeded, so independent steps overlap.
+    Steps with "wait_for" poll the named predicate from conditions instead of
+    running a command. Steps listed in completed are treated as already done.
+    When a step with a "status" starts, on_status(status) is awaited.
+    A failed step skips everything that depends on it. Returns True if all
+    steps succeeded.
+    """
+    conditions = conditions or {}
+    completed = completed or set()
+    tasks = {}
+    by_id = {step["id"]: step for step in steps}
+
+    async def run_step(step) -> bool:
+        dependencies = [tasks[dep] for dep in step.get("depends_on", [])]
+        if not all(await asyncio.gather(*dependencies)):
+            return False
+        if step["id"] in completed:
+            return True
+
+        description = step["description"]
+        timeout = step.get("timeout", DEPLOY_STEP_TIMEOUT)
+        if on_status and "status" in step:
+            await on_status(step["status"])
+        await TerminalLogger.log("info", "deployment", f"{description}...")
+
+        if "wait_for" in step:
+            ready = await wait_until(
+                conditions[step["wait_for"]], timeout=timeout, description=description
+            )
+            if not ready:
+                await TerminalLogger.log(
+                    "error", "deployment", f"{description} timed out after {timeout}s"
+                )
+            return ready
+
+        command = step["command"]
+        for placeholder, value in replacements.items():
+            command = command.replace(placeholder, value)
+        try:
+            await run_command(command, cwd, timeout)
+        except DeploymentError as e:
+            await TerminalLogger.log(
+                "error", "deployment", f"{description} failed. {e}"
+            )
+            return False
+        await TerminalLogger.log(
+            "success",
+            "deployment",
+            f"{description}. Command '{command}' executed successfully",
+        )
+        return True
+
+    # Create tasks in dependency order so every dependency already has a task
+    def schedule(step_id, visiting=()):
+        if step_id in tasks:
+            return
+        if step_id in visiting:
+            raise DeploymentError(f"Deployment steps have a cycle at '{step_id}'")
+        step = by_id[step_id]
+        for dep in step.get("depends_on", []):
+            schedule(dep, visiting + (step_id,))
+        tasks[step_id] = asyncio.create_task(run_step(step))
+
+    try:
+        for step in steps:
+            schedule(step["id"])
+        results = await asyncio.gather(*tasks.values())
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        raise
+    return all(results)
+
+
+def build_manifest(project_dir: str) -> dict:
+    """Map every file of the project (relative path) to the sha256 of its content."""
+    manifest = {}
+    for root, dirs, files in os.walk(project_dir):
+        dirs[:] = [d for d in dirs if d not in (".git", "node_modules")]
+        for name in files:
+            path = os.path.join(root, name)
+            digest = hashlib.sha256()
+            with open(path, "rb") as file:
+                for block in iter(lambda: file.read(65536), b""):
+                    digest.update(block)
+            relative_path = os.path.relpath(path, project_dir).replace(os.sep, "/")
+            manifest[relative_path] = digest.hexdigest()
+    return manifest
+
+
+def load_manifest(project_dir: str) -> dict | None:
+    try:
+        with open(os.path.join(project_dir, MANIFEST_PATH), "r") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def save_manifest(project_dir: str, manifest: dict):
+    with open(os.path.join(project_dir, MANIFEST_PATH), "w") as file:
+        json.dump(manifest, file, indent=2)
+
+
+def changed_files(old: dict, new: dict) -> list:
+    """Files added, modified or deleted between two manifests."""
+    return sorted(
+        path for path in old.keys() | new.keys() if old.get(path) != new.get(path)
+    )
+
+
+async def redeploy_to_github(
+    project_dir: str, manifest: dict, previous: dict, on_status=None
+) -> bool:
+    """Commit and push only the files that changed since the last deploy."""
+    changed = changed_files(previous, manifest)
+    if not changed:
+        await TerminalLogger.log(
+            "success", "deployment", "Nothing changed since the last deploy."
+        )
+        return True
+
+    await TerminalLogger.log(
+        "info", "deployment", f"Redeploying {len(changed)} changed file(s)"
+    )
+    return await run_steps(
+        incremental_commands,
+        project_dir,
+        {
+            "{FILES}": " ".join(shlex.quote(path) for path in changed),
+            "{COUNT}": str(len(changed)),
+        },
+        on_status=on_status,
+    )
 
 
 async def deploy_to_github(
-    github_username="Miran-Firdausi", repo_name="automated-repo-test", project_id=1
+    github_username="Miran-Firdausi",
+    repo_name="automated-repo-test",
+    project_id=1,
+    on_status=None,
 ):
+    """
+    Deploy a project to GitHub Pages. on_status(status) is awaited as the
+    deploy moves through its "pushing" and "pages_building" phases. Returns
+    once Pages is enabled; use watch_pages() to find out when the site is up.
+    Every step is safe to re-run, so retrying a failed deploy resumes it.
+    """
     project_dir = os.path.abspath(
         os.path.join(".", "code-environment", f"project-{project_id}")
     )
+    manifest = await asyncio.to_thread(build_manifest, project_dir)
+    repo_exists = await asyncio.to_thread(
+        github_repo_exists, github_username, repo_name
+    )
 
-    for command_item in commands:
-        try:
-            raw_command = command_item["command"]
-            description = command_item["description"]
+    # Already deployed from this directory: push only what changed
+    previous = load_manifest(project_dir)
+    if repo_exists and previous is not None:
+        success = await redeploy_to_github(project_dir, manifest, previous, on_status)
+        if success:
+            save_manifest(project_dir, manifest)
+        return success
 
-            # Format the command dynamically
-            command = raw_command.replace("{USERNAME}", github_username).replace(
-                "{REPO}", repo_name
-            )
+    conditions = {
+        "repo_exists": lambda: github_repo_exists(github_username, repo_name),
+        "main_branch_exists": lambda: github_branch_exists(
+            github_username, repo_name, "main"
+        ),
+    }
+    success = await run_steps(
+        commands,
+        project_dir,
+        {"{USERNAME}": github_username, "{REPO}": repo_name},
+        conditions,
+        # The repo survives a failed first deploy, so don't try to create it twice
+        completed={"create_repo"} if repo_exists else None,
+        on_status=on_status,
+    )
+    if success:
+        save_manifest(project_dir, manifest)
+    else:
+        await TerminalLogger.log(
+            "error", "deployment", "Deployment finished with errors."
+        )
+    return success
 
-            if command.startswith("sleep"):
-                seconds = int(command.split()[1])
-                print(f"Sleeping for {seconds} seconds...")
-                await asyncio.sleep(seconds)
-                continue
-
-            result = subprocess.run(
-                command,
-                shell=True,
-                check=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                cwd=project_dir,
-            )
-            success_message = f"{description}. Command '{command}' executed successfully:\n{result.stdout.decode()}"
-            await TerminalLogger.log("success", "deployment", success_message)
 
-        except subprocess.CalledProcessError as e:
-            error_message = f"Error executing command '{command}':\n{e.stderr.decode()}"
-            await TerminalLogger.log("error", "deployment", error_message)
+def watch_pages(github_username: str, repo_name: str, on_ready, on_timeout=None):
+    """
+    Poll in the background until the Pages site is served, then await
+    on_ready(). A first Pages build can take several minutes, so the deploy
+    itself does not wait for it.
+    """
+
+    async def watch():
+        ready = await wait_until(
+            lambda: github_pages_ready(github_username, repo_name),
+            timeout=PAGES_READY_TIMEOUT,
+            initial_delay=5,
+            max_delay=30,
+            description="GitHub Pages site",
+        )
+        if ready:
+            await on_ready()
+        elif on_timeout:
+            await on_timeout()
+
+    task = asyncio.create_task(watch())
+    _watchers.add(task)
+    task.add_done_callback(_watchers.discard)
+    return task
@@ -1,23 +1,51 @@
-import os
-from google import genai
-from google.generativeai import types
-from dotenv import load_dotenv, find_dotenv
+import asyncio
+import itertools
+from utils.key_pool import key_pool, is_rate_limit_error, is_transient_error
+from utils.llm_utils import estimate_tokens, get_genai_client
+from utils.upload_cache import upload_cache
 from .prompts import UI_DESIGNER_PROMPT
-import re
 
-load_dotenv(find_dotenv(), override=True)
+# Rough token cost of an uploaded sketch image
+IMAGE_TOKENS = 1290
 
 
-def generate_ui_from_image(prompt, image):
-    client = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
-    image_file = client.files.upload(file=image)
+async def stream_ui_from_image(prompt, image):
+    """Yield the response for a sketch-based page chunk by chunk."""
     final_prompt = prompt + UI_DESIGNER_PROMPT
-    response = client.models.generate_content(
-        model="gemini-2.5-flash", contents=[final_prompt, image_file]
-    )
-    html_match = re.search(r"(<html[\s\S]*?</html>)", response.text, re.IGNORECASE)
-    if html_match:
-        response_text = html_match.group(1)
-    else:
-        response_text = "<h1>Could not generate html</h1>"
-    return response_text
+    tokens = estimate_tokens(final_prompt) + IMAGE_TOKENS
+
+    streamed = False
+    for attempt in itertools.count():
+        key = await key_pool.aacquire(tokens)
+        image_file = None
+        try:
+            client = get_genai_client(key)
+            # Identical sketches are uploaded once per key and reused until expiry
+            image_file = await upload_cache.upload(client, key, image)
+            stream = await client.aio.models.generate_content_stream(
+                model="gemini-2.5-flash", contents=[final_prompt, image_file]
+            )
+            usage = None
+            async for chunk in stream:
+                usage = getattr(chunk, "usage_metadata", None) or usage
+                if chunk.text:
+                    streamed = True
+                    yield chunk.text
+            key_pool.record_usage(
+                key, tokens, getattr(usage, "total_token_count", None)
+            )
+            break
+        except Exception as e:
+            # Trying again is only possible before anything was consumed
+            delay = None if streamed else key_pool.recover(key, e, attempt)
+            if delay is not None:
+                await asyncio.sleep(delay)
+                continue
+            if (
+                image_file is not None
+                and not is_rate_limit_error(e)
+                and not is_transient_error(e)
+            ):
+                # The upload may have expired or been deleted; upload afresh next time
+                upload_cache.invalidate(key, image_file)
+            raise
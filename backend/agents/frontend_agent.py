@@ -2,46 +2,41 @@
 
 import os
 import re
-import time
 import json
 import asyncio
-import requests
-import itertools
+import hashlib
 from typing import List, Dict
 from langchain_core.tools import tool
 from langchain.schema import HumanMessage
-from langchain_google_genai import ChatGoogleGenerativeAI
 from dotenv import load_dotenv, find_dotenv
-from agents.designer_agent import generate_ui_from_image
-from utils.text_utils import extract_filename
+from agents.designer_agent import stream_ui_from_image
+from utils.text_utils import extract_filename, page_filename
 from utils.terminal_utils import TerminalLogger
-from .prompts import FRONTEND_SYSTEM_PROMPT, REACT_SYSTEM_PROMPT
-
+from utils.llm_utils import predict, apredict, astream
+from utils.html_stream import HTMLStreamExtractor
+from utils.image_service import image_service, extract_keywords
+from utils.jsx_parser import extract_files
+from utils.key_pool import key_pool
+from utils.sketch_detector import sketch_layout
+from .prompts import (
+    FRONTEND_SYSTEM_PROMPT,
+    REACT_SYSTEM_PROMPT,
+    LAYOUT_SHELL_PROMPT,
+    SKETCH_LAYOUT_PROMPT,
+)
 
 load_dotenv(find_dotenv(), override=True)
 
-# List of keys
-API_KEYS = [
-    os.getenv("GOOGLE_API_KEY"),
-    os.getenv("GOOGLE_API_KEY_2"),
-    os.getenv("GOOGLE_API_KEY_3"),
-]
-
-key_cycle = itertools.cycle(API_KEYS)
+# Maximum number of pages generated at the same time
+MAX_CONCURRENT_PAGES = int(
+    os.getenv("FRONTEND_MAX_CONCURRENCY", max(len(key_pool.keys), 1))
+)
 
+# Output token budget for page and component generation
+MAX_OUTPUT_TOKENS = 8192
 
-def get_llm():
-    """Return a ChatGoogleGenerativeAI instance with a rotated API key."""
-    key = next(key_cycle)
-    return ChatGoogleGenerativeAI(
-        google_api_key=key,
-        model="gemini-2.0-flash",
-        temperature=0,
-        max_output_tokens=8192,
-        max_tokens=None,
-        timeout=None,
-        max_retries=2,
-    )
+# Marks where each page's <main> goes inside the shared layout shell
+PAGE_CONTENT_PLACEHOLDER = "<!-- PAGE_CONTENT -->"
 
 
 def get_tools(project_id: str):
@@ -139,9 +134,7 @@ def identify_website_pages(description: str, mvp: str = "") -> List[Dict[str, st
     Be comprehensive but try to summarize the user journey in max 5 to 6 pages. Include only essential pages for the MVP functionality.
     Consider pages like: landing/home (index.html is the mandatory entry point not base.html or home.html), authentication (login/register), main application pages, user profile/settings if needed.
     """
-    llm = get_llm()
-
-    response = llm.predict(page_identification_prompt)
+    response = predict(page_identification_prompt)
 
     try:
         # Find JSON array in response
@@ -180,23 +173,30 @@ def identify_website_pages(description: str, mvp: str = "") -> List[Dict[str, st
         return fallback_pages
 
 
-def get_relevant_images(description: str) -> Dict[str, List[str]]:
+async def get_relevant_images(description: str) -> Dict[str, List[str]]:
     """
-    Extracts 3 relevant keywords from a description using a Gemini model,
-    fetches related images from the local FastAPI image service,
-    and returns them grouped by tag.
+    Extracts 3 relevant keywords from a description, fetches related images
+    from the local FastAPI image service, and returns them grouped by tag.
+    Keywords are extracted locally; the LLM is only asked when that finds none.
     """
+    tags = extract_keywords(description, 3)
+    if not tags:
+        tags = await _llm_keywords(description)
+    if len(tags) == 0:
+        tags = ["abstract"]
+
+    return await image_service.get_images(tags)
+
 
-    # Ask LLM to extract 3 keywords
+async def _llm_keywords(description: str) -> List[str]:
+    """Ask the LLM for 3 keywords."""
     prompt = (
         "Extract exactly 3 short, distinct keywords that best represent visual "
         "themes for the following website description. "
         "Return them as a JSON list of strings without any extra text.\n\n"
         f"Description:\n{description}"
     )
-    llm = get_llm()
-
-    response = llm.predict(prompt)
+    response = await apredict(prompt)
     keywords_text = response.strip()
 
     # Parse output safely
@@ -213,21 +213,7 @@ def get_relevant_images(description: str) -> Dict[str, List[str]]:
     except Exception:
         # Fallback: split by comma if model didn’t return JSON
         tags = [word.strip() for word in keywords_text.split(",") if word.strip()]
-
-    if len(tags) == 0:
-        tags = ["abstract"]
-
-    # Call local image service
-    try:
-        res = requests.post(
-            "http://localhost:8001/get_images", json={"tags": tags}, timeout=20
-        )
-        res.raise_for_status()
-        data = res.json()
-    except Exception as e:
-        raise RuntimeError(f"Image service request failed: {e}")
-
-    return data
+    return tags
 
 
 def find_matching_image(media_path: str, html_filename: str) -> str | None:
@@ -243,6 +229,55 @@ def find_matching_image(media_path: str, html_filename: str) -> str | None:
     return None
 
 
+def project_paths(chat_id) -> tuple[str, str]:
+    """Directory the site of a chat is generated into, and where its sketches live."""
+    base_path = os.path.abspath(
+        os.path.join(".", f"code-environment/project-{chat_id}")
+    )
+    media_path = os.path.abspath(os.path.join("media", "sketches", str(chat_id)))
+    return base_path, media_path
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(65536), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def page_fingerprint(
+    page: dict, mvp: str = "", design_guidelines: str = "", media_path: str = ""
+) -> str:
+    """Hash everything a page's content is generated from, including its sketch."""
+    image_path = find_matching_image(media_path, page_filename(page["name"]) or "")
+    payload = json.dumps(
+        {
+            "page": page,
+            "mvp": mvp,
+            "design_guidelines": design_guidelines,
+            "sketch": file_digest(image_path) if image_path else None,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def layout_fingerprint(
+    description: str, pages: List[dict], design_guidelines: str = ""
+) -> str:
+    """Hash everything the shared layout is generated from."""
+    payload = json.dumps(
+        {
+            "description": description,
+            "pages": [[page["name"], page["description"]] for page in pages],
+            "design_guidelines": design_guidelines,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
 def write_html_file(base_path: str, filename: str, html_content: str):
     """Writes HTML file to disk, ensuring valid HTML structure."""
     if "<html" not in html_content.lower():
@@ -253,12 +288,12 @@ def write_html_file(base_path: str, filename: str, html_content: str):
     print(f"   ✅ Created {filename} ({len(html_content)} chars)")
 
 
-def generate_frontend_prompts(
+async def generate_frontend_prompts(
     description: str, pages: List[dict], mvp: str = "", design_guidelines: str = ""
 ) -> List[str]:
     """Structure frontend requests into step-by-step page generation prompts."""
     try:
-        image_data = get_relevant_images(description)
+        image_data = await get_relevant_images(description)
     except Exception as e:
         print(f"[Warning] Could not fetch images: {e}")
         image_data = {}
@@ -278,14 +313,17 @@ def generate_frontend_prompts(
 
     for i, page_info in enumerate(pages):
         page_name = page_info["name"]
+        filename = page_filename(page_name) or f"{page_name}.html"
         page_description = page_info["description"]
         page_content = page_info["content"]
 
         # Create context about other pages for proper linking
-        other_pages = [p["name"] for p in pages if p["name"] != page_name]
-        other_pages_context = (
-            f"Other pages in this website: {', '.join(other_pages)}.html"
-        )
+        other_pages = [
+            page_filename(p["name"])
+            for p in pages
+            if p["name"] != page_name and page_filename(p["name"])
+        ]
+        other_pages_context = f"Other pages in this website: {', '.join(other_pages)}"
 
         # Add special instructions based on page type
         page_specific_instructions = ""
@@ -313,13 +351,11 @@ def generate_frontend_prompts(
         {visual_assets_context}
         - Optimize layout to visually balance text and imagery.
         - Give images width and height to avoid unexpected spillage
-        - Use Font Awesome (Free) icons via CDN:
-          <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.6.0/css/all.min.css">
-        - Integrate icons for buttons, navigation, features, and section headings where appropriate.
+        - Font Awesome (Free) icons are already loaded by the layout; use them for buttons, features, and section headings where appropriate.
         """
 
         prompt = f"""
-        Create a complete {page_name}.html file for the following project:
+        Create the content of the {filename} page for the following project:
 
         PROJECT CONTEXT:
         Description: {description.strip()}
@@ -327,19 +363,23 @@ def generate_frontend_prompts(
         Design Guidelines: {design_guidelines.strip()}
 
         PAGE SPECIFIC DETAILS:
-        Page Name: {page_name}.html
+        Page Name: {filename}
         Page Purpose: {page_description}
         Required Content/Elements: {page_content}
 
         WEBSITE STRUCTURE:
         {other_pages_context}
 
+        SHARED LAYOUT:
+        The <head> (Tailwind CDN, Font Awesome, fonts and theme tokens), the navigation header and the footer are shared by all pages and already exist. Do NOT generate them.
+
         TECHNICAL REQUIREMENTS:
-        - Use tailwind CDN for for modern and professional styling, and internal CSS if required for complex styling
-        - Include internal <script> tags for functionalities and interactivity.
+        - Return ONLY a single <main> element containing this page's sections
+        - Use tailwind classes for modern and professional styling, and an internal <style> inside <main> if required for complex styling
+        - Put page-specific <script> tags inside <main> for functionalities and interactivity.
         - Use meaningful id and class attributes where needed
         - Implement responsive design with mobile-first approach using CSS Grid and Flexbox
-        - Include proper navigation menu that links to other pages in the website
+        - Link to other pages in the website using their file names where relevant
         - Follow the design guideline for colors and typography
 
         {page_specific_instructions}
@@ -347,10 +387,9 @@ def generate_frontend_prompts(
 
         CRITICAL IMPLEMENTATION NOTES:
         - MANDATORY: Include ALL the required content/elements specified above for this specific page
-        - The HTML should be complete and self-contained
         - **IMPORTANT**: Generate clean HTML without any html escape characters (like &quot;) or literal newlines.
 
-        Generate the complete HTML file content and return it as clean, properly formatted HTML.
+        Return only the <main>...</main> element as clean, properly formatted HTML.
         """
 
         prompts.append(prompt)
@@ -374,104 +413,438 @@ def generate_frontend_prompts(
 #     return processed
 
 
-async def generate_frontend(prompts: List[str], chat_id: str, app_type="vanilla"):
-    """Generate frontend pages step by step with context of previously generated files."""
-    await TerminalLogger.log(
-        "info", "development", f"Starting development for project-{chat_id}"
-    )
-    await asyncio.sleep(2)
+def extract_html(content: str) -> str | None:
+    """Extract the HTML document from an LLM response, or None if there isn't one."""
+    start_idx = content.find("<!DOCTYPE html>")
+    if start_idx == -1:
+        start_idx = content.find("<html")
+    if start_idx == -1:
+        return None
 
-    # Create project directory
-    base_path = os.path.abspath(
-        os.path.join(".", f"code-environment/project-{chat_id}")
+    end_idx = content.rfind("</html>")
+    if end_idx == -1:
+        # Take everything from start
+        return content[start_idx:]
+    return content[start_idx : end_idx + len("</html>")]
+
+
+def generate_layout_prompt(
+    description: str, pages: List[dict], design_guidelines: str = ""
+) -> str:
+    """Build the prompt for the layout shell shared by every page."""
+    page_list = "\n".join(
+        f"- {page_filename(page['name'])}: {page['description']}"
+        for page in pages
+        if page_filename(page["name"])
+    )
+    return LAYOUT_SHELL_PROMPT.format(
+        description=description.strip(),
+        design_guidelines=design_guidelines.strip(),
+        pages=page_list,
+        placeholder=PAGE_CONTENT_PLACEHOLDER,
     )
-    media_path = os.path.abspath(os.path.join("media", str(chat_id)))
-    os.makedirs(base_path, exist_ok=True)
-    print(f"📁 Created project directory: {base_path}")
 
-    system_prompt = (
-        REACT_SYSTEM_PROMPT if app_type == "react" else FRONTEND_SYSTEM_PROMPT
+
+def fallback_layout(pages: List[dict]) -> str:
+    """Plain layout shell used when the LLM could not produce one."""
+    links = "\n".join(
+        f'        <a href="{page_filename(page["name"])}" class="hover:underline">'
+        f'{"Home" if page["name"] == "index" else page["name"].replace("-", " ").title()}</a>'
+        for page in pages
+        if page_filename(page["name"])
     )
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Website</title>
+    <script src="https://cdn.tailwindcss.com"></script>
+    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.6.0/css/all.min.css">
+</head>
+<body class="min-h-screen flex flex-col">
+    <header class="p-4 shadow">
+        <nav class="flex flex-wrap gap-4">
+{links}
+        </nav>
+    </header>
+    {PAGE_CONTENT_PLACEHOLDER}
+    <footer class="p-4 text-center text-sm">&copy; All rights reserved.</footer>
+</body>
+</html>"""
+
+
+async def generate_layout(layout_prompt: str, pages: List[dict]) -> str:
+    """Generate the shared layout shell (head, nav, footer, theme) once per site."""
+    await TerminalLogger.log("progress", "development", "Generating shared layout")
+    try:
+        content = await apredict(
+            f"{FRONTEND_SYSTEM_PROMPT}\n\nUser Request:\n{layout_prompt}",
+            cache=False,
+            max_output_tokens=MAX_OUTPUT_TOKENS,
+        )
+        layout = extract_html(content)
+    except Exception as e:
+        print(f"   ❌ Error generating layout: {e}")
+        layout = None
+
+    if layout and PAGE_CONTENT_PLACEHOLDER not in layout:
+        # Tolerate shells that left an empty <main> or omitted the marker
+        main = re.search(r"<main\b.*?</main>", layout, re.DOTALL | re.IGNORECASE)
+        if main:
+            layout = layout.replace(main.group(0), PAGE_CONTENT_PLACEHOLDER)
+        elif "<footer" in layout:
+            layout = layout.replace(
+                "<footer", f"{PAGE_CONTENT_PLACEHOLDER}\n<footer", 1
+            )
+        elif "</body>" in layout:
+            layout = layout.replace(
+                "</body>", f"{PAGE_CONTENT_PLACEHOLDER}\n</body>", 1
+            )
+        else:
+            layout = None
 
-    total_pages = len(prompts)
+    if layout is None:
+        await TerminalLogger.log(
+            "warning", "development", "Could not generate a layout, using a plain one"
+        )
+        return fallback_layout(pages)
 
-    for i, user_request in enumerate(prompts, 1):
-        print(f"\n🔄 Generating page {i}/{total_pages}...")
+    await TerminalLogger.log("success", "development", "Generated shared layout")
+    return layout
 
-        filename = extract_filename(user_request)
-        if not filename:
-            print("   ❌ Could not extract filename from prompt.")
-            continue
 
-        print(f"   📄 Generating: {filename}")
-        image_path = find_matching_image(media_path, filename)
+def extract_main(content: str) -> str | None:
+    """Extract the <main> element from an LLM response, or None if there isn't one."""
+    start_idx = content.find("<main")
+    end_idx = content.rfind("</main>")
+    if start_idx == -1 or end_idx == -1:
+        return None
+    return content[start_idx : end_idx + len("</main>")]
+
+
+def stitch_page(layout: str, filename: str, main_html: str) -> str:
+    """Insert a page's <main> into the layout and give the page its own title."""
+    html = layout.replace(PAGE_CONTENT_PLACEHOLDER, main_html, 1)
+    page_name = filename.removesuffix(".html")
+    if page_name != "index":
+        page_title = page_name.replace("-", " ").title()
+        html = re.sub(
+            r"<title>(.*?)</title>",
+            lambda match: f"<title>{page_title} | {match.group(1)}</title>",
+            html,
+            count=1,
+            flags=re.DOTALL,
+        )
+    return html
+
+
+async def write_html_stream(
+    chunks, base_path: str, filename: str, layout: str | None = None
+) -> bool:
+    """
+    Write a page to disk while the model is still generating it. With a layout,
+    only the streamed <main> is taken and written between the layout's head and
+    tail; if the model returns a full document without one, that document is
+    used as-is. Returns False (keeping any previous version) if no HTML was
+    produced.
+    """
+    extractor = HTMLStreamExtractor("main" if layout else "html")
+    # With a layout, a full document is kept aside in case no <main> arrives
+    document = HTMLStreamExtractor("html") if layout else None
+    document_html = []
+    prefix, suffix = "", ""
+    if layout:
+        prefix, suffix = stitch_page(layout, filename, PAGE_CONTENT_PLACEHOLDER).split(
+            PAGE_CONTENT_PLACEHOLDER, 1
+        )
+
+    file_path = os.path.join(base_path, filename)
+    previous = None
+    if os.path.exists(file_path):
+        with open(file_path, "r", encoding="utf-8") as f:
+            previous = f.read()
+
+    file = None
+    size = 0
+
+    def write(html: str):
+        nonlocal file, size
+        if file is None:
+            file = open(file_path, "w", encoding="utf-8")
+            file.write(prefix)
+        file.write(html)
+        file.flush()
+        size += len(html)
 
-        # Create the full prompt with system instructions
-        full_prompt = f"{system_prompt}\n\nUser Request:\n{user_request}"
+    try:
+        async for chunk in chunks:
+            html = extractor.feed(chunk)
+            if html:
+                write(html)
+            if extractor.finished:
+                break
+            if document and not extractor.started:
+                document_html.append(document.feed(chunk))
+                if document.finished:
+                    break
+        html = extractor.close()
+        if html:
+            write(html)
+        if file:
+            file.write(suffix)
+        elif document:
+            html = "".join(document_html) + document.close()
+            if html:
+                print(f"   ⚠️ {filename} came back as a full document, using it as-is")
+                prefix, extractor = "", document
+                write(html)
+    except BaseException:
+        if file:
+            file.close()
+            _restore(file_path, previous)
+        raise
+    finally:
+        # Stop the model once the element is complete instead of reading chatter
+        await chunks.aclose()
+    if file is None:
+        return False
+    file.close()
+
+    if extractor.errors:
+        print(
+            f"   ⚠️ {filename} has unbalanced markup: {', '.join(extractor.errors[:5])}"
+        )
+    print(f"   ✅ Created {filename} ({size} chars streamed)")
+    return True
+
+
+def _restore(file_path: str, previous: str | None):
+    """Put back the previous version of a page after a failed generation."""
+    if previous is None:
+        os.remove(file_path)
+    else:
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(previous)
+
+
+async def generate_page(
+    user_request: str,
+    system_prompt: str,
+    base_path: str,
+    media_path: str,
+    semaphore: asyncio.Semaphore,
+    position: str = "",
+    layout: str | None = None,
+    filename: str | None = None,
+) -> bool:
+    """Generate a single page, writing it to disk as it streams in."""
+    filename = filename or extract_filename(user_request)
+    if not filename:
+        print("   ❌ Could not extract filename from prompt.")
+        await TerminalLogger.log(
+            "error", "development", f"Could not extract filename for page {position}"
+        )
+        return False
+
+    image_path = find_matching_image(media_path, filename)
+
+    # Create the full prompt with system instructions
+    full_prompt = f"{system_prompt}\n\nUser Request:\n{user_request}"
 
+    async with semaphore:
+        await TerminalLogger.log(
+            "progress", "development", f"Generating {filename} {position}".strip()
+        )
         try:
-            llm = get_llm()
+            sketch = None
             if image_path:
                 print(
                     f"   🖼️ Found image match for {filename}: {os.path.basename(image_path)}"
                 )
-                html_content = generate_ui_from_image(full_prompt, image_path)
+                digest = await asyncio.to_thread(file_digest, image_path)
+                sketch = await asyncio.to_thread(sketch_layout, image_path, digest)
+
+            if sketch:
+                # The detected layout goes to the text model instead of the image
+                print(
+                    f"   🔍 Using detected layout for {filename} "
+                    f"({sketch['elements']} elements, {sketch['confidence']:.2f})"
+                )
+                chunks = astream(
+                    full_prompt + SKETCH_LAYOUT_PROMPT.format(spec=sketch["spec"]),
+                    cache=False,
+                    max_output_tokens=MAX_OUTPUT_TOKENS,
+                )
+            elif image_path:
+                chunks = stream_ui_from_image(full_prompt, image_path)
             else:
-                response = llm.invoke(full_prompt)
-                html_content = getattr(response, "content", None) or getattr(
-                    response, "text", str(response)
+                chunks = astream(
+                    full_prompt, cache=False, max_output_tokens=MAX_OUTPUT_TOKENS
                 )
+            written = await write_html_stream(chunks, base_path, filename, layout)
+        except Exception as e:
+            print(f"   ❌ Error generating {filename}: {e}")
+            await TerminalLogger.log(
+                "error", "development", f"Failed to generate {filename}: {e}"
+            )
+            return False
 
-                # Look for HTML content in the response
-                if "<!DOCTYPE html>" in html_content or "<html" in html_content:
-                    # Extract the HTML content
-                    start_idx = html_content.find("<!DOCTYPE html>")
-                    if start_idx == -1:
-                        start_idx = html_content.find("<html")
-
-                    if start_idx != -1:
-                        end_idx = html_content.rfind("</html>") + 7
-                        if end_idx > 6:  # Found closing tag
-                            actual_html = html_content[start_idx:end_idx]
-                        else:
-                            # Take everything from start
-                            actual_html = html_content[start_idx:]
-
-                        # Clean the HTML content
-                        processed_html = actual_html
-
-                        # Write the file
-                        file_path = os.path.join(base_path, filename)
-                        with open(file_path, "w", encoding="utf-8") as f:
-                            f.write(processed_html)
-
-                        print(
-                            f"   ✅ Successfully created {filename} ({len(processed_html)} characters)"
-                        )
-                    else:
-                        print(f"   ❌ No HTML content found in response for {filename}")
-                        print(f"   Response preview: {html_content[:200]}...")
-                else:
-                    print(f"   ❌ No HTML structure found in response for {filename}")
-                    print(f"   Response preview: {html_content[:200]}...")
+    if not written:
+        print(f"   ❌ No HTML structure found in response for {filename}")
+        await TerminalLogger.log(
+            "error", "development", f"No HTML content generated for {filename}"
+        )
+        return False
+
+    await TerminalLogger.log("success", "development", f"Generated {filename}")
+    return True
 
-        except Exception as e:
-            print(f"   ❌ Error generating content: {e}")
-            continue
 
-    print(f"\n🎉 Generated all pages successfully!")
+async def generate_frontend(
+    prompts: List[str],
+    chat_id: str,
+    app_type="vanilla",
+    layout: str | None = None,
+    filenames: List[str] | None = None,
+):
+    """
+    Generate all frontend pages concurrently, writing each page as it finishes.
+    With a layout, each page only generates its <main> and is stitched into it.
+    Filenames default to the one named in each prompt. Returns whether each
+    prompt produced a page.
+    """
     await TerminalLogger.log(
-        "success",
-        "development",
-        f"Development completed! Generated all pages.",
+        "info", "development", f"Starting development for project-{chat_id}"
     )
 
+    # Create project directory
+    base_path, media_path = project_paths(chat_id)
+    os.makedirs(base_path, exist_ok=True)
+    print(f"📁 Created project directory: {base_path}")
 
-def structure_react_requests(
+    system_prompt = (
+        REACT_SYSTEM_PROMPT if app_type == "react" else FRONTEND_SYSTEM_PROMPT
+    )
+
+    total_pages = len(prompts)
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_PAGES)
+    print(f"\n🔄 Generating {total_pages} pages ({MAX_CONCURRENT_PAGES} at a time)...")
+
+    results = await asyncio.gather(
+        *(
+            generate_page(
+                user_request,
+                system_prompt,
+                base_path,
+                media_path,
+                semaphore,
+                position=f"({i}/{total_pages})",
+                layout=layout,
+                filename=filenames[i - 1] if filenames else None,
+            )
+            for i, user_request in enumerate(prompts, 1)
+        )
+    )
+
+    generated = sum(results)
+    if generated == total_pages:
+        print(f"\n🎉 Generated all pages successfully!")
+        await TerminalLogger.log(
+            "success",
+            "development",
+            f"Development completed! Generated all pages.",
+        )
+    else:
+        print(f"\n⚠️ Generated {generated}/{total_pages} pages.")
+        await TerminalLogger.log(
+            "warning",
+            "development",
+            f"Development completed with errors. Generated {generated}/{total_pages} pages.",
+        )
+    return results
+
+
+async def update_frontend(
+    pages: List[dict],
+    prompts: List[str],
+    chat_id: str,
+    layout: str | None = None,
+    mvp: str = "",
+    design_guidelines: str = "",
+    previous: dict | None = None,
+) -> dict:
+    """
+    Regenerate only the pages whose fingerprint changed since the last run.
+    Unchanged pages reuse their HTML (re-stitched into the current layout) and
+    files of removed pages are deleted. Returns the new page fingerprints.
+    """
+    previous = previous or {}
+    base_path, media_path = project_paths(chat_id)
+    fingerprints = {}
+    stale = []
+
+    for page, prompt in zip(pages, prompts):
+        filename = page_filename(page["name"])
+        if filename is None:
+            print(f"   ❌ Skipping page with invalid name {page['name']!r}")
+            await TerminalLogger.log(
+                "error", "development", f"Invalid page name {page['name']!r}"
+            )
+            continue
+        file_path = os.path.join(base_path, filename)
+        fingerprint = page_fingerprint(page, mvp, design_guidelines, media_path)
+        if previous.get(page["name"]) != fingerprint or not os.path.exists(file_path):
+            stale.append((page["name"], filename, prompt, fingerprint))
+            continue
+
+        fingerprints[page["name"]] = fingerprint
+        if layout:
+            with open(file_path, "r", encoding="utf-8") as f:
+                current = f.read()
+            main_html = extract_main(current)
+            if main_html and stitch_page(layout, filename, main_html) != current:
+                write_html_file(
+                    base_path, filename, stitch_page(layout, filename, main_html)
+                )
+
+    current_files = {page_filename(page["name"]) for page in pages}
+    for name in previous.keys() - {page["name"] for page in pages}:
+        filename = page_filename(name)
+        if filename is None or filename in current_files:
+            continue
+        file_path = os.path.join(base_path, filename)
+        if os.path.exists(file_path):
+            os.remove(file_path)
+            print(f"   🗑️ Removed {filename}")
+
+    reused = len(fingerprints)
+    if reused:
+        await TerminalLogger.log(
+            "info",
+            "development",
+            f"Reusing {reused} unchanged page(s), regenerating {len(stale)}",
+        )
+    if stale:
+        results = await generate_frontend(
+            [prompt for _, _, prompt, _ in stale],
+            chat_id,
+            layout=layout,
+            filenames=[filename for _, filename, _, _ in stale],
+        )
+        for (name, _, _, fingerprint), generated in zip(stale, results):
+            if generated:
+                fingerprints[name] = fingerprint
+    return fingerprints
+
+
+DEFAULT_REACT_COMPONENTS = ["App", "Header", "HomePage", "LoginPage", "Dashboard"]
+
+
+def identify_react_components(
     description: str, mvp: str = "", design_guidelines: str = ""
-) -> List[str]:
-    """Structure React frontend requests into step-by-step component generation prompts."""
-    # First identify main components/pages needed
+) -> List[dict]:
+    """Identify the components of a React app and which of them each one imports."""
     components_identification_prompt = f"""
     Based on the following React project description, identify the main components and pages needed.
     
@@ -483,149 +856,125 @@ def structure_react_requests(
     1. The component name (without .jsx extension)
     2. A clear description of what this component does
     3. Key props, state, and functionality it should have
+    4. The names of the other components from this list that it imports and renders
     
     Return ONLY a JSON array of objects with this structure:
     [
         {{
             "name": "App",
             "description": "Main application component with routing",
-            "functionality": "Sets up React Router, manages global state, renders main layout with navigation"
+            "functionality": "Sets up React Router, manages global state, renders main layout with navigation",
+            "imports": ["Header", "HomePage"]
         }},
         {{
             "name": "Header",
             "description": "Navigation header component",
-            "functionality": "Logo, navigation menu, user authentication status, responsive mobile menu"
+            "functionality": "Logo, navigation menu, user authentication status, responsive mobile menu",
+            "imports": []
         }}
     ]
     
     Be comprehensive but realistic. Focus on essential components for the MVP.
     """
-    llm = get_llm()
-
-    response = llm.predict(components_identification_prompt)
+    response = predict(
+        components_identification_prompt, max_output_tokens=MAX_OUTPUT_TOKENS
+    )
 
     try:
-        import json
-
         start = response.find("[")
         end = response.rfind("]") + 1
-        if start != -1 and end != 0:
-            components_json = response[start:end]
-            components_data = json.loads(components_json)
-            # Validate structure and extract component names for grouping
-            if isinstance(components_data, list) and all(
-                isinstance(comp, dict) and "name" in comp for comp in components_data
-            ):
-                components = [comp["name"] for comp in components_data]
-                components_details = components_data
-            else:
-                components = ["App", "Header", "HomePage", "LoginPage", "Dashboard"]
-                components_details = [
-                    {
-                        "name": comp,
-                        "description": f"{comp} component",
-                        "functionality": "Basic functionality",
-                    }
-                    for comp in components
-                ]
-        else:
-            components = ["App", "Header", "HomePage", "LoginPage", "Dashboard"]
-            components_details = [
-                {
-                    "name": comp,
-                    "description": f"{comp} component",
-                    "functionality": "Basic functionality",
-                }
-                for comp in components
-            ]
+        components = json.loads(response[start:end]) if start != -1 else None
     except Exception:
-        components = ["App", "Header", "HomePage", "LoginPage", "Dashboard"]
-        components_details = [
+        components = None
+
+    if not isinstance(components, list) or not all(
+        isinstance(comp, dict) and "name" in comp for comp in components
+    ):
+        # Without a usable answer, App renders everything else
+        components = [
             {
                 "name": comp,
                 "description": f"{comp} component",
                 "functionality": "Basic functionality",
+                "imports": DEFAULT_REACT_COMPONENTS[1:] if comp == "App" else [],
             }
-            for comp in components
+            for comp in DEFAULT_REACT_COMPONENTS
         ]
 
-    prompts = []
-
-    # Group components into logical generation steps
-    component_groups = []
-
-    # First group: Core structure (App, routing, main layout)
-    core_components = [
-        c
-        for c in components
-        if c.lower() in ["app", "header", "footer", "navbar", "layout"]
-    ]
-    if core_components:
-        component_groups.append(core_components)
-
-    # Second group: Main pages
-    page_components = [
-        c
-        for c in components
-        if "page" in c.lower()
-        or c.lower() in ["home", "login", "register", "dashboard"]
-    ]
-    page_components = [c for c in page_components if c not in core_components]
-    if page_components:
-        # Split pages into smaller groups if too many
-        for i in range(0, len(page_components), 3):
-            component_groups.append(page_components[i : i + 3])
-
-    # Third group: Utility components
-    utility_components = [
-        c for c in components if c not in core_components and c not in page_components
-    ]
-    if utility_components:
-        for i in range(0, len(utility_components), 2):
-            component_groups.append(utility_components[i : i + 2])
-
-    for i, component_group in enumerate(component_groups):
-        other_components = [c for c in components if c not in component_group]
-        other_components_context = (
-            f"Other components in this project: {', '.join(other_components)}.jsx"
-        )
+    names = {comp["name"] for comp in components}
+    for comp in components:
+        comp.setdefault("description", f"{comp['name']} component")
+        comp.setdefault("functionality", "Basic functionality")
+        imports = comp.get("imports") or []
+        comp["imports"] = [
+            name
+            for name in dict.fromkeys(imports)
+            if name in names and name != comp["name"]
+        ]
+    return components
+
+
+def break_import_cycles(components: List[dict]) -> List[dict]:
+    """Drop imports that would close a cycle, so the components form a DAG."""
+    by_name = {comp["name"]: comp for comp in components}
+    state = {}
+
+    def visit(name):
+        state[name] = "visiting"
+        comp = by_name[name]
+        kept = []
+        for dep in comp["imports"]:
+            if state.get(dep) == "visiting":
+                print(f"⚠️ Ignoring circular import {name} -> {dep}")
+                continue
+            if dep not in state:
+                visit(dep)
+            kept.append(dep)
+        comp["imports"] = kept
+        state[name] = "done"
+
+    for comp in components:
+        if comp["name"] not in state:
+            visit(comp["name"])
+    return components
 
-        if i > 0:
-            previous_groups = [c for group in component_groups[:i] for c in group]
-            previous_context = f"Previously generated components: {', '.join(previous_groups)}.jsx - ensure consistency and proper imports."
-        else:
-            previous_context = "This is the first set of components being generated."
 
-        # Get detailed information for components in this group
-        group_details = []
-        for comp_name in component_group:
-            comp_detail = next(
-                (c for c in components_details if c["name"] == comp_name), None
-            )
-            if comp_detail:
-                group_details.append(
-                    f"- {comp_name}: {comp_detail['description']} | Functionality: {comp_detail['functionality']}"
-                )
-            else:
-                group_details.append(
-                    f"- {comp_name}: Component functionality to be determined"
-                )
+def structure_react_requests(
+    description: str, mvp: str = "", design_guidelines: str = ""
+) -> List[dict]:
+    """
+    Structure the React app into one generation task per component. Each task
+    lists the components it imports, which must be generated before it.
+    """
+    components = break_import_cycles(
+        identify_react_components(description, mvp, design_guidelines)
+    )
+    names = [comp["name"] for comp in components]
 
-        component_details_text = "\n".join(group_details)
+    tasks = []
+    for comp in components:
+        other_components_context = "Other components in this project: " + ", ".join(
+            f"{name}.jsx" for name in names if name != comp["name"]
+        )
+        imports_context = (
+            f"It imports and renders: {', '.join(comp['imports'])}. Their exported signatures are given below."
+            if comp["imports"]
+            else "It does not import any other component of this project."
+        )
 
         prompt = f"""
-        Generate the following React components for this project:
+        Generate the following React component for this project:
         
         Project Description: {description.strip()}
         MVP Features: {mvp.strip()}
         Design Guidelines: {design_guidelines.strip()}
         
         COMPONENT SPECIFIC DETAILS:
-        {component_details_text}
+        - {comp["name"]}: {comp["description"]} | Functionality: {comp["functionality"]}
         
-        Components to generate in this step: {', '.join(component_group)}
+        Component to generate in this step: {comp["name"]}.jsx
+        {imports_context}
         {other_components_context}
-        {previous_context}
         
         Requirements:
         - Use functional components with React hooks
@@ -638,22 +987,138 @@ def structure_react_requests(
         - Ensure responsive design
         - Use semantic HTML elements
         - Available libraries: react-router-dom, axios, react-icons, @heroicons/react, prop-types, lodash, date-fns, react-markdown
-        - IMPORTANT: Implement the specific functionality described above for each component
-        - **MANDATORY**: Use the write_file tool to save each component as ComponentName.jsx
-        - **DO NOT** display the code in your response - only use the write_file tool
+        - IMPORTANT: Implement the specific functionality described above for the component
+        - **MANDATORY**: Return the component in its own fenced code block whose info string is its path relative to src/, e.g. ```jsx {comp["name"]}.jsx
+        - If the component needs helper files (hooks, utils), return each one as another fenced block named the same way, e.g. ```js hooks/useForm.js
+        - Every file must be complete: never truncate or abbreviate code
         
-        Generate complete, functional React components and save them using write_file tool.
+        Generate a complete, functional React component and return it in this format.
         """
 
-        prompts.append(prompt)
+        tasks.append(
+            {"component": comp["name"], "imports": comp["imports"], "prompt": prompt}
+        )
 
-    return prompts
+    return tasks
+
+
+def component_signature(name: str, code: str) -> str:
+    """
+    Summarise what a component exports: its declaration with the props it
+    destructures, its propTypes and its default export. Used instead of the
+    full source when generating components that import it.
+    """
+    lines = [f"// {name}.jsx"]
+    declaration = re.search(
+        rf"^.*\b(?:function\s+{name}\s*\(|(?:const|let)\s+{name}\s*=).*$",
+        code,
+        re.MULTILINE,
+    )
+    if declaration:
+        lines.append(declaration.group(0).strip())
+
+    prop_types = re.search(rf"{name}\.propTypes\s*=\s*\{{", code)
+    if prop_types:
+        depth = 0
+        for end in range(prop_types.end() - 1, len(code)):
+            if code[end] == "{":
+                depth += 1
+            elif code[end] == "}":
+                depth -= 1
+                if depth == 0:
+                    lines.append(code[prop_types.start() : end + 1] + ";")
+                    break
+
+    export = re.search(r"^export default .*$", code, re.MULTILINE)
+    if export:
+        lines.append(export.group(0).strip())
+    return "\n".join(lines)
+
+
+def component_files(jsx_content: str, jsx_file: str, src_path: str) -> dict:
+    """
+    Extract every file of an LLM response and map it to its absolute path.
+    Bare component names go to src/components/ (App.jsx to src/); paths
+    outside src/ are ignored.
+    """
+    files = {}
+    for path, code in extract_files(jsx_content, [f"{jsx_file}.jsx"]).items():
+        path = os.path.normpath(re.sub(r"^(?:\./)?(?:src/)?", "", path))
+        if "/" not in path.replace(os.sep, "/") and path.lower() != "app.jsx":
+            path = os.path.join("components", path)
+        file_path = os.path.abspath(os.path.join(src_path, path))
+        if not file_path.startswith(os.path.abspath(src_path) + os.sep):
+            print(f"⚠️ Skipping {path}: outside of src/")
+            continue
+        files[file_path] = code
+    return files
+
+
+async def generate_component(
+    task: dict,
+    src_path: str,
+    components_path: str,
+    dependencies: dict,
+    semaphore: asyncio.Semaphore,
+) -> str | None:
+    """Generate one component once the components it imports exist. Returns its signature."""
+    jsx_file = task["component"]
+    signatures = await asyncio.gather(*(dependencies[dep] for dep in task["imports"]))
+    context_info = ""
+    available = [signature for signature in signatures if signature]
+    if available:
+        context_info = (
+            "\n\nExported signatures of the components it imports "
+            "(App.jsx is in src/, the others in src/components/):\n\n"
+            + "\n\n".join(available)
+        )
+
+    # Create the full prompt with system instructions
+    full_prompt = (
+        f"{REACT_SYSTEM_PROMPT}\n\nUser Request:\n{task['prompt']}{context_info}"
+    )
+
+    async with semaphore:
+        await TerminalLogger.log(
+            "progress", "development", f"Generating {jsx_file}.jsx"
+        )
+        try:
+            jsx_content = await apredict(
+                full_prompt, cache=False, max_output_tokens=MAX_OUTPUT_TOKENS
+            )
+        except Exception as e:
+            print(f"❌ Error generating {jsx_file}.jsx: {e}")
+            await TerminalLogger.log(
+                "error", "development", f"Failed to generate {jsx_file}.jsx: {e}"
+            )
+            return None
+
+    # App.jsx goes to src/, others to components/
+    if jsx_file.lower() == "app":
+        file_path = os.path.join(src_path, f"{jsx_file}.jsx")
+    else:
+        file_path = os.path.join(components_path, f"{jsx_file}.jsx")
+
+    files = component_files(jsx_content, jsx_file, src_path)
+    if file_path not in files:
+        print(f"❌ No JSX content found for {jsx_file}")
+        return None
 
+    for path, code in files.items():
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(code)
+        print(f"✅ Successfully created {os.path.relpath(path, src_path)}")
+    return component_signature(jsx_file, files[file_path])
 
-async def generate_react_frontend(prompts: List[str], project_id: str):
-    """Generate React frontend components step by step with context of previously generated files."""
+
+async def generate_react_frontend(tasks: List[dict], project_id: str):
+    """
+    Generate React components concurrently, in the order of their import graph:
+    a component starts as soon as the components it imports are generated, and
+    receives only their exported signatures as context.
+    """
     await TerminalLogger.log("info", "development", "React development started!")
-    await asyncio.sleep(3)
 
     # Create project directory structure
     base_path = os.path.abspath(
@@ -664,133 +1129,33 @@ async def generate_react_frontend(prompts: List[str], project_id: str):
     os.makedirs(src_path, exist_ok=True)
     os.makedirs(components_path, exist_ok=True)
 
-    generated_components = []
-
-    for i, user_request in enumerate(prompts):
-        time.sleep(2)
-
-        # Add context of previously generated components
-        context_info = ""
-        if generated_components:
-            context_info = f"\n\nPreviously generated components for reference:\n"
-            for comp_info in generated_components:
-                context_info += f"\n--- {comp_info['filename']} ---\n"
-                # Include first 800 chars to avoid token limits
-                content_preview = (
-                    comp_info["content"][:800] + "..."
-                    if len(comp_info["content"]) > 800
-                    else comp_info["content"]
-                )
-                context_info += content_preview
-                context_info += "\n"
-
-        # Create the full prompt with system instructions
-        full_prompt = (
-            f"{REACT_SYSTEM_PROMPT}\n\nUser Request:\n{user_request}{context_info}"
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_PAGES)
+    futures = {}
+    by_name = {task["component"]: task for task in tasks}
+
+    # Create tasks in dependency order so every import already has a task
+    def schedule(name):
+        if name in futures:
+            return
+        task = by_name[name]
+        for dep in task["imports"]:
+            schedule(dep)
+        futures[name] = asyncio.create_task(
+            generate_component(task, src_path, components_path, futures, semaphore)
         )
 
-        # Use direct LLM call
-        try:
-            llm = get_llm()
-            response = llm.invoke(full_prompt)
-
-            # Extract component names from the request
-            import re
-
-            jsx_matches = re.findall(r"(\w+)\.jsx", user_request)
-
-            # Get response content
-            jsx_content = (
-                response.content if hasattr(response, "content") else str(response)
-            )
-
-            # Try to extract and save each component
-            for jsx_file in jsx_matches:
-                # Look for the component code in the response
-                if f"{jsx_file}" in jsx_content and (
-                    "import" in jsx_content
-                    or "function" in jsx_content
-                    or "const" in jsx_content
-                ):
-                    # Try to extract the component code
-                    # Look for patterns like "// ComponentName.jsx" or similar
-                    component_start = jsx_content.find(f"{jsx_file}")
-                    if component_start != -1:
-                        # Find the actual JSX code - look for import statements or function declarations
-                        code_start = jsx_content.find(
-                            "import",
-                            component_start - 200 if component_start > 200 else 0,
-                        )
-                        if code_start == -1:
-                            code_start = jsx_content.find(
-                                "function",
-                                component_start - 100 if component_start > 100 else 0,
-                            )
-                        if code_start == -1:
-                            code_start = jsx_content.find(
-                                "const",
-                                component_start - 100 if component_start > 100 else 0,
-                            )
-
-                        if code_start != -1:
-                            # Find the end of the component (look for export default or end of file)
-                            code_end = jsx_content.find("export default", code_start)
-                            if code_end != -1:
-                                code_end = jsx_content.find(";", code_end) + 1
-                                if code_end == 0:  # No semicolon found
-                                    code_end = (
-                                        jsx_content.find(
-                                            "\n",
-                                            jsx_content.find(
-                                                "export default", code_start
-                                            ),
-                                        )
-                                        + 1
-                                    )
-                            else:
-                                # Take a reasonable chunk
-                                code_end = code_start + 2000
-
-                            component_code = jsx_content[code_start:code_end].strip()
-
-                            # Determine file path (App.jsx goes to src/, others to components/)
-                            if jsx_file.lower() == "app":
-                                file_path = os.path.join(src_path, f"{jsx_file}.jsx")
-                            else:
-                                file_path = os.path.join(
-                                    components_path, f"{jsx_file}.jsx"
-                                )
-
-                            # Process the component code to fix newlines
-                            # Replace literal \n with actual newlines
-                            processed_code = component_code.replace("\\n", "\n")
-                            # Also handle \t for tabs
-                            processed_code = processed_code.replace("\\t", "\t")
-                            # Remove any extra quotes that might wrap the content
-                            processed_code = processed_code.strip("\"'")
-
-                            # Write the file
-                            with open(file_path, "w", encoding="utf-8") as f:
-                                f.write(processed_code)
-
-                            print(f"✅ Successfully created {jsx_file}.jsx")
-
-                            # Store for context
-                            generated_components.append(
-                                {
-                                    "filename": f"{jsx_file}.jsx",
-                                    "content": processed_code,
-                                }
-                            )
-                        else:
-                            print(f"❌ Could not find component code for {jsx_file}")
-                    else:
-                        print(f"❌ Component {jsx_file} not found in response")
-                else:
-                    print(f"❌ No JSX content found for {jsx_file}")
+    for task in tasks:
+        schedule(task["component"])
+    signatures = await asyncio.gather(*futures.values())
 
-        except Exception as e:
-            print(f"❌ Error generating React components: {e}")
-            continue
-
-    await TerminalLogger.log("success", "development", "React development finished!")
+    generated = sum(1 for signature in signatures if signature)
+    if generated == len(tasks):
+        await TerminalLogger.log(
+            "success", "development", "React development finished!"
+        )
+    else:
+        await TerminalLogger.log(
+            "warning",
+            "development",
+            f"React development finished with errors. Generated {generated}/{len(tasks)} components.",
+        )
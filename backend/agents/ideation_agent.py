@@ -1,30 +1,12 @@
-import os
-from langchain_google_genai import ChatGoogleGenerativeAI
-from dotenv import load_dotenv, find_dotenv
-
-
-load_dotenv(find_dotenv(), override=True)
-
-# Initialize multiple LLMs for debate
-llm_mvp_generator = ChatGoogleGenerativeAI(
-    google_api_key=os.getenv("GOOGLE_API_KEY"),
-    model="gemini-2.0-flash",
-    temperature=0.7,
-)
-llm_design_brainstorm = ChatGoogleGenerativeAI(
-    google_api_key=os.getenv("GOOGLE_API_KEY"),
-    model="gemini-2.0-flash",
-    temperature=0.6,
-)
-llm_techstack_decider = ChatGoogleGenerativeAI(
-    google_api_key=os.getenv("GOOGLE_API_KEY"),
-    model="gemini-2.0-flash",
-    temperature=0.7,
-)
+from utils.llm_utils import predict, astream
 
+# Sampling temperatures of the ideation steps
+MVP_GENERATOR_TEMPERATURE = 0.7
+DESIGN_BRAINSTORM_TEMPERATURE = 0.6
+TECHSTACK_DECIDER_TEMPERATURE = 0.7
 
-# Generate Initial MVP Feature List
-def generate_mvp_features(product_description, changes):
+
+def mvp_features_prompt(product_description, changes=None):
     prompt = f"""
     Given the product description: "{product_description}",
     generate a very minimal MVP feature list. 
@@ -36,13 +18,23 @@ def generate_mvp_features(product_description, changes):
         prompt += (
             f"\nConsider the previous MVP/features and user suggestions: {changes}"
         )
+    return prompt
+
 
-    response = llm_mvp_generator.predict(prompt)
+# Generate Initial MVP Feature List
+def generate_mvp_features(product_description, changes):
+    prompt = mvp_features_prompt(product_description, changes)
+    response = predict(prompt, temperature=MVP_GENERATOR_TEMPERATURE)
     return response
 
 
-# Brainstorm Design Guidelines
-def brainstorm_design_guidelines(product_description, changes=None):
+def stream_mvp_features(product_description, changes=None):
+    """Stream the MVP feature list as it is generated."""
+    prompt = mvp_features_prompt(product_description, changes)
+    return astream(prompt, temperature=MVP_GENERATOR_TEMPERATURE)
+
+
+def design_guidelines_prompt(product_description, changes=None):
     prompt = f"""
     Given the product description: "{product_description}", suggest clear and focused design guidelines and themes.
     Focus only on design aspects like color palette and typography.
@@ -56,11 +48,22 @@ def brainstorm_design_guidelines(product_description, changes=None):
 
     if changes:
         prompt += f"\nIncorporate the following user suggestions or previous recommendations: {changes}"
+    return prompt
 
-    response = llm_design_brainstorm.predict(prompt)
+
+# Brainstorm Design Guidelines
+def brainstorm_design_guidelines(product_description, changes=None):
+    prompt = design_guidelines_prompt(product_description, changes)
+    response = predict(prompt, temperature=DESIGN_BRAINSTORM_TEMPERATURE)
     return response
 
 
+def stream_design_guidelines(product_description, changes=None):
+    """Stream the design guidelines as they are generated."""
+    prompt = design_guidelines_prompt(product_description, changes)
+    return astream(prompt, temperature=DESIGN_BRAINSTORM_TEMPERATURE)
+
+
 def decide_tech_stack(product_description, final_mvp, design_guidelines):
     prompt = f"""
     Given the product description: "{product_description}", the finalized MVP feature list: {final_mvp}, and the design guidelines: {design_guidelines},
@@ -71,5 +74,5 @@ def decide_tech_stack(product_description, final_mvp, design_guidelines):
     For database we can go with sqlite for development and later switch to a more robust database.
     Don't give options; just provide a single tech stack recommendation.
     """
-    response = llm_techstack_decider.predict(prompt)
+    response = predict(prompt, temperature=TECHSTACK_DECIDER_TEMPERATURE)
     return response
@@ -0,0 +1,233 @@
+"""
+Local intent classifier that resolves common chat replies without an LLM call.
+Anything it is not confident about is escalated to the LLM interpreter.
+"""
+
+import os
+import re
+from difflib import SequenceMatcher
+from typing import Tuple
+from dotenv import load_dotenv, find_dotenv
+
+load_dotenv(find_dotenv(), override=True)
+
+INTENT_CONFIDENCE_THRESHOLD = float(os.getenv("INTENT_CONFIDENCE_THRESHOLD", 0.8))
+
+APPROVE_PHRASES = {
+    "yes",
+    "y",
+    "yeah",
+    "yea",
+    "yep",
+    "yup",
+    "sure",
+    "absolutely",
+    "certainly",
+    "of course",
+    "ok",
+    "okay",
+    "k",
+    "alright",
+    "all right",
+    "fine",
+    "good",
+    "great",
+    "perfect",
+    "nice",
+    "awesome",
+    "cool",
+    "approve",
+    "approved",
+    "confirm",
+    "confirmed",
+    "agreed",
+    "proceed",
+    "continue",
+    "next",
+    "go",
+    "go ahead",
+    "go for it",
+    "do it",
+    "lets go",
+    "lets do it",
+    "move on",
+    "move forward",
+    "ship it",
+    "looks good",
+    "looks great",
+    "looks fine",
+    "looks perfect",
+    "sounds good",
+    "sounds great",
+    "works for me",
+    "i like it",
+    "i love it",
+    "love it",
+}
+
+REJECT_PHRASES = {
+    "no",
+    "n",
+    "nope",
+    "nah",
+    "never",
+    "not at all",
+    "negative",
+    "no way",
+    "absolutely not",
+    "reject",
+    "rejected",
+    "dont",
+    "dont do it",
+    "i dont like it",
+    "not good",
+    "not really",
+    "scrap it",
+    "scrap this",
+    "start over",
+}
+
+# Words that can surround an approval/rejection without changing its meaning
+FILLER_WORDS = {
+    "please",
+    "pls",
+    "thanks",
+    "thank",
+    "you",
+    "thx",
+    "then",
+    "that",
+    "this",
+    "it",
+    "is",
+    "all",
+    "so",
+    "very",
+    "really",
+    "just",
+    "now",
+    "sir",
+    "mate",
+}
+
+STAGE_ALIASES = {
+    "mvp": "generate_mvp",
+    "features": "generate_mvp",
+    "feature list": "generate_mvp",
+    "ideation": "generate_mvp",
+    "design": "design",
+    "design guidelines": "design",
+    "colors": "design",
+    "tech stack": "tech_stack",
+    "stack": "tech_stack",
+    "development": "development",
+    "dev": "development",
+    "pages": "development",
+    "test": "test",
+    "testing": "test",
+    "deploy": "deployment",
+    "deployment": "deployment",
+}
+
+GO_BACK_PATTERN = re.compile(
+    r"^(?:can we |lets |please |i want to |i would like to )*"
+    r"(?:go|take me|move|return|get|jump)\s+back\s+to\s+(?:the\s+)?(?P<stage>[a-z ]+?)"
+    r"(?:\s+(?:stage|step|phase))?$"
+)
+
+QUESTION_PATTERN = re.compile(
+    r"^(?:what|why|which|who|whom|whose|where|when|how(?! about))\b"
+)
+
+
+def normalize(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    text = text.lower().replace("'", "").replace("’", "")
+    text = re.sub(r"[^a-z0-9?\s]", " ", text)
+    return " ".join(text.split())
+
+
+def _phrase_score(text: str, phrases: set) -> float:
+    """
+    How well text matches a phrase table: 1.0 for exact, 0.95 for phrases
+    joined by filler words, and the token-by-token similarity for typos.
+    Anything else scores below INTENT_CONFIDENCE_THRESHOLD.
+    """
+    if text in phrases:
+        return 1.0
+    # Replies made up of phrases and filler, e.g. "yes please, looks good"
+    remaining = text
+    for phrase in sorted(phrases, key=len, reverse=True):
+        remaining = re.sub(rf"\b{re.escape(phrase)}\b", " ", remaining)
+    leftover = [word for word in remaining.split() if word not in FILLER_WORDS]
+    if len(remaining.split()) < len(text.split()) and not leftover:
+        return 0.95
+    # Typos such as "yess" or "looks god", compared word for word
+    core = [word for word in text.split() if word not in FILLER_WORDS]
+    if not core:
+        return 0.0
+    best = 0.0
+    for phrase in phrases:
+        words = phrase.split()
+        if len(words) == len(core):
+            best = max(
+                best,
+                min(
+                    SequenceMatcher(None, word, target).ratio()
+                    for word, target in zip(core, words)
+                ),
+            )
+    # Extra or missing words change the meaning too easily to be trusted
+    loose = max(
+        SequenceMatcher(None, " ".join(core), phrase).ratio() for phrase in phrases
+    )
+    return max(best, min(loose, INTENT_CONFIDENCE_THRESHOLD - 0.05))
+
+
+def _mentions(text: str) -> set:
+    """Which phrase tables text contains a phrase of, longest phrases first."""
+    tables = sorted(
+        [(phrase, "approve") for phrase in APPROVE_PHRASES]
+        + [(phrase, "reject") for phrase in REJECT_PHRASES],
+        key=lambda item: len(item[0]),
+        reverse=True,
+    )
+    found = set()
+    for phrase, table in tables:
+        pattern = rf"\b{re.escape(phrase)}\b"
+        if re.search(pattern, text):
+            found.add(table)
+            text = re.sub(pattern, " ", text)
+    return found
+
+
+def classify_intent(user_input: str) -> Tuple[dict, float]:
+    """
+    Classify a chat reply into approve/reject/go_back/question.
+    Returns the request in the interpreter's format and a confidence in [0, 1].
+    """
+    text = normalize(user_input)
+    if not text:
+        return {"intent": "incomplete"}, 0.0
+
+    match = GO_BACK_PATTERN.match(text.rstrip("?").strip())
+    if match and match.group("stage") in STAGE_ALIASES:
+        return {
+            "intent": "go_back",
+            "target_stage": STAGE_ALIASES[match.group("stage")],
+        }, 0.95
+
+    # A question is never an approval or rejection, e.g. "is that ok?"
+    if "?" in text:
+        confidence = 0.85 if QUESTION_PATTERN.match(text) else 0.5
+        return {"intent": "question", "message": user_input.strip()}, confidence
+
+    # Mixed replies such as "no, looks good" are left to the interpreter
+    if len(_mentions(text)) > 1:
+        return {"intent": "incomplete"}, 0.5
+
+    approve = _phrase_score(text, APPROVE_PHRASES)
+    reject = _phrase_score(text, REJECT_PHRASES)
+    if approve >= reject:
+        return {"intent": "approve"}, approve
+    return {"intent": "reject"}, reject
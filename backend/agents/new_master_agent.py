@@ -1,79 +1,67 @@
-import os
 import json
+import asyncio
 from asgiref.sync import async_to_sync, sync_to_async
 from typing import Tuple
 from utils.chat_utils import ChatUtil
-from langchain_google_genai import ChatGoogleGenerativeAI
+from utils.terminal_utils import TerminalLogger
 from dotenv import load_dotenv, find_dotenv
 from chat.models import Chat
-from projects.models import DevelopmentStage, Project, AgentSteps
+from projects.models import DevelopmentStage, Project, AgentSteps, DeployStatus
 from .ideation_agent import (
-    generate_mvp_features,
+    stream_mvp_features,
     brainstorm_design_guidelines,
+    stream_design_guidelines,
     decide_tech_stack,
 )
 from .frontend_agent import (
-    generate_frontend,
+    update_frontend,
+    generate_layout,
+    generate_layout_prompt,
+    layout_fingerprint,
     get_relevant_images,
     identify_website_pages,
     generate_frontend_prompts,
 )
-from .deploy_agent import deploy_to_github
+from .deploy_agent import deploy_to_github, watch_pages
+from .intent_classifier import classify_intent, INTENT_CONFIDENCE_THRESHOLD
 from utils.github_utils import github_user_exists, github_repo_exists
 from utils.text_utils import extract_json_from_text
+from utils.llm_utils import apredict, astream
+from utils.speculation import speculative_executor
 from .prompts import (
     INTERPRETER_SYSTEM_PROMPT,
     ANSWER_USER_QUERY_PROMPT,
     CODE_PLANNER_PROMPT,
 )
-import time
 
 load_dotenv(find_dotenv(), override=True)
 
 
+async def _single_chunk(text: str):
+    """Wrap an already computed response so it can go through stream_message."""
+    yield text
+
+
 class MasterAgent:
     def __init__(self, chat_id: int):
         self.chat = Chat.objects.get(id=chat_id)
         self.project, _ = Project.objects.get_or_create(chat=self.chat)
 
     async def handle_input(self, user_input: str) -> Tuple[str, bool]:
-        yes_terms = {
-            "yes",
-            "y",
-            "yeah",
-            "yep",
-            "sure",
-            "absolutely",
-            "certainly",
-            "of course",
-            "ok",
-            "okay",
-            "alright",
-        }
-        no_terms = {
-            "no",
-            "n",
-            "nope",
-            "nah",
-            "never",
-            "not at all",
-            "negative",
-            "no way",
-            "absolutely not",
-        }
-
-        if user_input.lower() in yes_terms:
-            request = {"intent": "approve"}
-        elif user_input.lower() in no_terms:
-            request = {"intent": "reject"}
-        else:
+        # Resolve common replies locally and only ask the LLM when unsure
+        request, confidence = classify_intent(user_input)
+        is_confident = confidence >= INTENT_CONFIDENCE_THRESHOLD
+        if is_confident:
+            print(f"⚡ Classified intent locally: {request} ({confidence:.2f})")
+
+        if not (is_confident and request["intent"] in ("approve", "reject")):
             # We can improve it by adding a form instead
             if self.project.current_step == "deployment" and (
                 self.project.github_username is None
                 or self.project.github_repo_name is None
             ):
                 request = {"intent": "details"}
-            else:
+            elif not is_confident:
                 last_assistant_msg = await sync_to_async(
                     lambda: self.chat.messages.filter(sender="assistant").last()
                 )()
@@ -84,7 +72,7 @@ class MasterAgent:
                     "mvp_features": self.project.mvp,
                 }
                 project_context = {k: v for k, v in project_context.items() if v}
-                request = self._interpret_feedback(
+                request = await self._interpret_feedback(
                     user_input, last_msg, project_context
                 )
 
@@ -109,10 +97,15 @@ class MasterAgent:
                 "tech_stack": self.project.tech_stack,
                 "deployed_url": self.project.deployed_url,
             }
-            response = self._answer_user_query(
-                request.get("question", ""), project_context
+            await ChatUtil.stream_message(
+                self.chat,
+                self._answer_user_query(
+                    request.get("message") or request.get("question", ""),
+                    project_context,
+                ),
+                False,
+                step,
             )
-            await ChatUtil.send_message(self.chat, response, False, step)
             return
 
         # Handle going back to previous step (can be used anywhere in the flow)
@@ -184,15 +177,17 @@ class MasterAgent:
 
     async def _handle_generate_mvp(self, request=None):
         if not self.project.mvp:
-            mvp = self._generate_mvp()
-            self.project.mvp = mvp
-            await sync_to_async(self.project.save)()
-            await ChatUtil.send_message(
+            mvp = await ChatUtil.stream_message(
                 self.chat,
-                f"Here are the MVP features I've generated:\n\n{mvp}\n. You can suggest any changes or confirm if you want to move forward with this MVP?",
+                self._generate_mvp(),
                 True,
                 "Ideation",
+                prefix="Here are the MVP features I've generated:\n\n",
+                suffix="\n. You can suggest any changes or confirm if you want to move forward with this MVP?",
             )
+            self.project.mvp = mvp
+            await sync_to_async(self.project.save)()
+            self._speculate_design()
             return
         if request.get("intent") == "approve":
             # Move to designing phase
@@ -202,6 +197,8 @@ class MasterAgent:
 
         elif request.get("intent") == "reject":
             # User does not want to confirm the MVP. So ask user what they want to change.
+            speculative_executor.discard(self.chat.id, "design")
+            speculative_executor.discard(self.chat.id, "images")
             await ChatUtil.send_message(
                 self.chat,
                 "I understand. Please suggest what changes you have in your mind.",
@@ -211,15 +208,17 @@ class MasterAgent:
         elif request.get("intent") == "modify":
             # Handle requested modifications
             modify_mvp_request = request.get("message", "")
-            mvp = self._generate_mvp(modify_mvp_request)
-            self.project.mvp = mvp
-            await sync_to_async(self.project.save)()
-            await ChatUtil.send_message(
+            mvp = await ChatUtil.stream_message(
                 self.chat,
-                f"I've updated the product description and generated new MVP features:\n\n{mvp}\n\nShall we move to design phase?",
+                self._generate_mvp(modify_mvp_request),
                 True,
                 "Ideation",
+                prefix="I've updated the product description and generated new MVP features:\n\n",
+                suffix="\n\nShall we move to design phase?",
             )
+            self.project.mvp = mvp
+            await sync_to_async(self.project.save)()
+            self._speculate_design()
         else:
             await ChatUtil.send_message(
                 self.chat,
@@ -231,18 +230,29 @@ class MasterAgent:
     async def _handle_design(self, request=None):
         # Generate design guidelines
         if not self.project.design_guidelines:
-            design = self._generate_design()
-            self.project.design_guidelines = design
-            await sync_to_async(self.project.save)()
-
-            await ChatUtil.send_message(
+            description = self.project.product_description
+            design = await speculative_executor.take(
+                self.chat.id, "design", (description,)
+            )
+            design = await ChatUtil.stream_message(
                 self.chat,
-                f"Based on this MVP, I've created these design guidelines:\n{design}\n\nShould I recommend a tech stack for implementation?",
+                _single_chunk(design) if design else self._generate_design(),
                 True,
                 "Design",
                 ui_flags={"show_color_picker": True},
+                prefix="Based on this MVP, I've created these design guidelines:\n",
+                suffix="\n\nShould I recommend a tech stack for implementation?",
+            )
+            self.project.design_guidelines = design
+            await sync_to_async(self.project.save)()
+
+            self._speculate_pages()
+
+            images = await speculative_executor.take(
+                self.chat.id, "images", (description,)
             )
-            images = get_relevant_images(self.project.product_description)
+            if images is None:
+                images = await get_relevant_images(description)
             all_image_urls = []
             for tag, urls in images.items():
                 all_image_urls.extend(urls)
@@ -260,6 +270,7 @@ class MasterAgent:
             await self._handle_tech_stack()
 
         elif request.get("intent") == "reject":
+            speculative_executor.discard(self.chat.id, "pages")
             await ChatUtil.send_message(
                 self.chat,
                 "Let's reconsider the design approach. Please provide what kind of design guidelines you would like instead?",
@@ -268,18 +279,17 @@ class MasterAgent:
             )
         elif request.get("intent") == "modify" and request.get("message"):
             # Handle design modifications then generate tech stack
-            modified_design = self._generate_design(request.get("message"))
-            self.project.design_guidelines = modified_design
-
-            self.project.current_step = "tech_stack"
-            await sync_to_async(self.project.save)()
-
-            await ChatUtil.send_message(
+            modified_design = await ChatUtil.stream_message(
                 self.chat,
-                f"Updated design guidelines:\n{modified_design}",
+                self._generate_design(request.get("message")),
                 False,
                 "Design",
+                prefix="Updated design guidelines:\n",
             )
+            self.project.design_guidelines = modified_design
+
+            self.project.current_step = "tech_stack"
+            await sync_to_async(self.project.save)()
             await self._handle_tech_stack()
 
         else:
@@ -312,9 +322,17 @@ class MasterAgent:
         intent = request.get("intent") if request else None
 
         if not dev_stage.pages:
-            pages = identify_website_pages(
-                description=self.project.product_description, mvp=self.project.mvp
+            pages = await speculative_executor.take(
+                self.chat.id,
+                "pages",
+                (self.project.product_description, self.project.mvp),
             )
+            if pages is None:
+                pages = await asyncio.to_thread(
+                    identify_website_pages,
+                    description=self.project.product_description,
+                    mvp=self.project.mvp,
+                )
             dev_stage.pages = pages
             await sync_to_async(dev_stage.save)()
 
@@ -335,7 +353,7 @@ class MasterAgent:
                 if dev_stage.prompts:
                     prompts = dev_stage.prompts
                 else:
-                    prompts = generate_frontend_prompts(
+                    prompts = await generate_frontend_prompts(
                         description=self.project.product_description,
                         pages=dev_stage.pages,
                         mvp=self.project.mvp,
@@ -352,8 +370,37 @@ class MasterAgent:
                     project_stage="Development",
                 )
 
+                fingerprints = dev_stage.fingerprints or {}
+                layout_key = layout_fingerprint(
+                    self.project.product_description,
+                    dev_stage.pages,
+                    self.project.design_guidelines or "",
+                )
+                if not dev_stage.layout or fingerprints.get("layout") != layout_key:
+                    dev_stage.layout = await generate_layout(
+                        generate_layout_prompt(
+                            self.project.product_description,
+                            dev_stage.pages,
+                            self.project.design_guidelines or "",
+                        ),
+                        dev_stage.pages,
+                    )
+                    fingerprints["layout"] = layout_key
+                    dev_stage.fingerprints = fingerprints
+                    await sync_to_async(dev_stage.save)()
+
                 chat_id = await sync_to_async(lambda: self.project.chat.id)()
-                await generate_frontend(dev_stage.prompts, chat_id)
+                fingerprints["pages"] = await update_frontend(
+                    dev_stage.pages,
+                    dev_stage.prompts,
+                    chat_id,
+                    layout=dev_stage.layout,
+                    mvp=self.project.mvp or "",
+                    design_guidelines=self.project.design_guidelines or "",
+                    previous=fingerprints.get("pages"),
+                )
+                dev_stage.fingerprints = fingerprints
+                await sync_to_async(dev_stage.save)()
 
                 await ChatUtil.send_message(
                     self.chat,
@@ -455,7 +502,7 @@ class MasterAgent:
             else:
                 user_input = user_input.strip()
                 # Handle GitHub username collection:
-                if not github_user_exists(user_input):
+                if not await asyncio.to_thread(github_user_exists, user_input):
                     await ChatUtil.send_message(
                         self.chat,
                         "I couldn't find that GitHub user. Please double-check and send the correct username.",
@@ -475,7 +522,9 @@ class MasterAgent:
                     return
         if self.project.github_repo_name is None:
             # Handle GitHub repo name collection
-            if github_repo_exists(self.project.github_username, user_input):
+            if await asyncio.to_thread(
+                github_repo_exists, self.project.github_username, user_input
+            ):
                 await ChatUtil.send_message(
                     self.chat,
                     f"⚠️ A repository named '{user_input}' already exists under your account. Please choose a different repository name.",
@@ -496,17 +545,46 @@ class MasterAgent:
 
         # chat_id = await sync_to_async(lambda: self.project.chat.id)()
         # Usual deployment flows here
-        await deploy_to_github(
+        await self._set_deploy_status(DeployStatus.QUEUED)
+        success = await deploy_to_github(
             github_username=self.project.github_username,
             repo_name=self.project.github_repo_name,
             project_id=self.project.id,
+            on_status=self._set_deploy_status,
         )
+        if not success:
+            await self._set_deploy_status(DeployStatus.FAILED)
+            await ChatUtil.send_message(
+                self.chat,
+                "❌ Deployment failed. Check the terminal for details, then send any message to retry.",
+                False,
+                "Deployment",
+            )
+            return
 
         # Update to completed state immediately
         self.project.current_step = "complete"
         self.project.deployed_url = f"https://{self.project.github_username}.github.io/{self.project.github_repo_name}/"
         await sync_to_async(self.project.save)()
 
+        if self.project.deploy_status == DeployStatus.PAGES_BUILDING:
+            # First deploy: the site goes live when GitHub finishes building it
+            await self._set_deploy_status(DeployStatus.PAGES_BUILDING)
+            watch_pages(
+                self.project.github_username,
+                self.project.github_repo_name,
+                self._pages_live,
+                self._pages_slow,
+            )
+            await ChatUtil.send_message(
+                self.chat,
+                f"✅ Your application has been deployed! GitHub Pages is building it, and it will be live at **{self.project.deployed_url}** in a few minutes.\nFinish Project?",
+                True,
+                "Deployment",
+            )
+            return
+
+        await self._set_deploy_status(DeployStatus.LIVE)
         await ChatUtil.send_message(
             self.chat,
             f"✅ Your application has been deployed! View it at **{self.project.deployed_url}**.\nFinish Project?",
@@ -514,6 +592,41 @@ class MasterAgent:
             "Deployment",
         )
 
+    async def _set_deploy_status(self, status: str):
+        """Record a deploy state transition and push it to the chat's sockets."""
+        status = DeployStatus(status).value
+        self.project.deploy_status = status
+        await sync_to_async(self.project.save)(
+            update_fields=["deploy_status", "updated_at"]
+        )
+        await ChatUtil.send_deploy_status(
+            self.chat.id,
+            status,
+            (
+                self.project.deployed_url
+                if status in (DeployStatus.PAGES_BUILDING, DeployStatus.LIVE)
+                else None
+            ),
+        )
+
+    async def _pages_live(self):
+        """Mark the deploy live, unless a newer deploy has started since."""
+        current = await sync_to_async(
+            lambda: Project.objects.filter(id=self.project.id)
+            .values_list("deploy_status", flat=True)
+            .first()
+        )()
+        if current == DeployStatus.PAGES_BUILDING:
+            await self._set_deploy_status(DeployStatus.LIVE)
+
+    async def _pages_slow(self):
+        await TerminalLogger.log(
+            "info",
+            "deployment",
+            f"GitHub Pages is still building {self.project.deployed_url}. It will appear there once the build finishes.",
+            chat_id=self.chat.id,
+        )
+
     async def _handle_complete(self, request=None):
         if request.get("intent") == "modify":
             await ChatUtil.send_message(
@@ -531,18 +644,43 @@ class MasterAgent:
                 "Complete",
             )
 
+    # Speculative precomputation of the stage the user is most likely to approve next
+    def _speculate_design(self):
+        description = self.project.product_description
+        speculative_executor.start(
+            self.chat.id,
+            "design",
+            (description,),
+            brainstorm_design_guidelines,
+            description,
+        )
+        speculative_executor.start(
+            self.chat.id, "images", (description,), get_relevant_images, description
+        )
+
+    def _speculate_pages(self):
+        description, mvp = self.project.product_description, self.project.mvp
+        speculative_executor.start(
+            self.chat.id,
+            "pages",
+            (description, mvp),
+            identify_website_pages,
+            description,
+            mvp,
+        )
+
     # Helper methods for LLM-based generation
     def _generate_mvp(self, changes=None):
-        """Generate MVP features based on product description using LLM"""
+        """Stream MVP features based on product description using LLM"""
         changes_request = None
         if changes:
             changes_request = f"{self.project.mvp}\nUser suggestion: {changes}"
-        return generate_mvp_features(self.project.product_description, changes_request)
+        return stream_mvp_features(self.project.product_description, changes_request)
         # return f"Features for {self.project.product_description}:\n1. User authentication\n2. Data storage\n3. Basic UI with essential controls\n4. Core functionality implementation"
 
     def _generate_design(self, changes=None):
         """
-        Generate design guidelines based on product description
+        Stream design guidelines based on product description
         If changes are provided, they are considered along with previous recommendations.
         """
         changes_request = None
@@ -550,7 +688,7 @@ class MasterAgent:
             changes_request = (
                 f"{self.project.design_guidelines}\nUser suggestion: {changes}"
             )
-        return brainstorm_design_guidelines(
+        return stream_design_guidelines(
             self.project.product_description, changes_request
         )
         # return "Design Guidelines:\n- Font: Roboto\n- Color scheme: #3FCF8E (primary), #FFFFFF (secondary)\n- Minimalist UI with clear hierarchy\n- Responsive design for all device sizes"
@@ -568,7 +706,7 @@ class MasterAgent:
         """Update frontend based on user feedback"""
         return "Updated Frontend Implementation:\n- Modified UI components based on feedback\n- Enhanced responsive design\n- Improved user experience flow\n- Added requested visual elements"
 
-    def _interpret_feedback(
+    async def _interpret_feedback(
         self, feedback: str, last_question: str = "", project_context: dict = None
     ) -> dict:
         print(feedback, last_question, project_context)
@@ -578,12 +716,7 @@ class MasterAgent:
             project_context=json.dumps(project_context, indent=2),
         )
 
-        interpreter_llm = ChatGoogleGenerativeAI(
-            google_api_key=os.getenv("GOOGLE_API_KEY"),
-            model="gemini-2.0-flash",
-            temperature=0.7,
-        )
-        response = interpreter_llm.predict(prompt)
+        response = await apredict(prompt, model="gemini-2.0-flash", temperature=0.7)
 
         try:
             data = extract_json_from_text(response)
@@ -598,7 +731,8 @@ class MasterAgent:
             print(e)
             return {"intent": "incomplete", "error": str(e)}
 
-    def _answer_user_query(self, query: str, project_context: dict) -> str:
+    async def _answer_user_query(self, query: str, project_context: dict):
+        """Stream an answer to the user's question about the project."""
         # Prepare safe, trimmed context
         context = {k: v for k, v in project_context.items() if v}
         context_str = json.dumps(context, indent=2)
@@ -607,15 +741,15 @@ class MasterAgent:
             user_query=query.strip(), project_context=context_str
         )
 
-        llm = ChatGoogleGenerativeAI(
-            google_api_key=os.getenv("GOOGLE_API_KEY"),
-            model="gemini-2.0-flash-lite",
-            temperature=0.6,
-        )
-
+        answered = False
         try:
-            response = llm.predict(prompt).strip()
-            return response if response else "Sorry, I couldn't come up with an answer."
+            async for chunk in astream(
+                prompt, model="gemini-2.0-flash-lite", temperature=0.6, cache=False
+            ):
+                answered = answered or bool(chunk.strip())
+                yield chunk
+            if not answered:
+                yield "Sorry, I couldn't come up with an answer."
         except Exception as e:
             print("An error occurred while generating a response: ", e)
-            return f"An error occurred while generating a response"
+            yield f"An error occurred while generating a response"
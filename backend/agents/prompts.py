@@ -289,3 +289,45 @@ Sketch based instructions:
 - images are typically represented by a box with an "X".
 - Use placeholder text like "Title", "Username", "Enter email", etc., where relevant.
 """
+
+SKETCH_LAYOUT_PROMPT = """
+The user sketched the layout of this page. The sketch was converted into the following layout tree:
+
+{spec}
+
+How to read it:
+- {{"col": [...]}} stacks its children vertically, top to bottom.
+- {{"row": [...]}} places its children side by side, left to right.
+- A leaf "Type:N%" is a UI element (Heading, Paragraph, Image, Button, Label, TextBox, ComboBox, Link, CheckBox, RadioButton) that takes about N% of the page width.
+
+Sketch based instructions:
+- Ensure layout and structure closely follow this tree; every element in it must appear on the page.
+- Enhance the appearance with clean, modern UI elements and improvise the content of each element from the page description.
+- Use placeholder text like "Title", "Username", "Enter email", etc., where relevant.
+"""
+
+LAYOUT_SHELL_PROMPT = """
+Create the shared layout shell for a multi-page static website. Every page of the site will be built by inserting its own <main> element into this shell, so it must contain everything that is common to all pages and nothing page specific.
+
+PROJECT DESCRIPTION:
+{description}
+
+DESIGN GUIDELINES:
+{design_guidelines}
+
+PAGES (link every one of them in the navigation):
+{pages}
+
+THE SHELL MUST CONTAIN:
+- A complete <!DOCTYPE html> document with <head> and <body>
+- In <head>: meta charset and viewport, a <title> with the site name, the Tailwind CDN script, Font Awesome (Free) via CDN:
+  <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.6.0/css/all.min.css">
+  and the web fonts from the design guidelines
+- Theme tokens from the design guidelines (colors and typography) defined once, as CSS custom properties in an internal <style> block and/or a tailwind.config script
+- A responsive <header> with the site name/logo and a navigation menu linking to every page above (use the exact file names), including a mobile menu toggle
+- A <footer> with relevant links and information
+- An internal <script> for the shared behaviour (e.g. the mobile menu toggle)
+- The exact comment {placeholder} on its own line between the header and the footer, where each page's <main> element will be inserted. Do not add a <main> element yourself.
+
+Generate clean HTML without any html escape characters (like &quot;) and return only the HTML document.
+"""
@@ -8,23 +8,41 @@ from agents.new_master_agent import MasterAgent
 from projects.models import Project
 from utils.terminal_utils import TerminalLogger
 from utils.chat_utils import ChatUtil
+from utils.job_queue import job_queue
 
 
 class ChatConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         self.chat_id = self.scope["url_route"]["kwargs"]["chat_id"]
+        self.group_name = ChatUtil.group_name(self.chat_id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
         await self.accept()
         print("connected")
-        ChatUtil.set_websocket(self)
-        await TerminalLogger.log("info", "Setup", f"Connected to chat {self.chat_id}")
+        await TerminalLogger.log(
+            "info", "Setup", f"Connected to chat {self.chat_id}", chat_id=self.chat_id
+        )
 
     async def disconnect(self, close_code):
-        ChatUtil.clear_websocket()
+        await self.channel_layer.group_discard(self.group_name, self.channel_name)
 
     async def receive(self, text_data):
         data = json.loads(text_data)
+
+        if data.get("type") == "cancel":
+            job_queue.cancel(data.get("job_id"), chat_id=self.chat_id)
+            return
+
         user_message = data.get("content", "")
+        # Run the turn in the background so this socket keeps processing frames
+        await job_queue.submit(
+            self.chat_id,
+            self.handle_message,
+            user_message,
+            notify=ChatUtil.send_job_status,
+        )
 
+    async def handle_message(self, user_message):
+        TerminalLogger.bind(self.chat_id)
         master_agent = await get_master_agent(self.chat_id)
         # chat = await get_chat(self.chat_id, self.scope["user"])
         # project_stage = Project.objects.get(chat=chat).current_step
@@ -33,6 +51,9 @@ class ChatConsumer(AsyncWebsocketConsumer):
     async def send_json(self, content):
         await self.send(text_data=json.dumps(content))
 
+    async def chat_message(self, event):
+        await self.send_json(event["content"])
+
 
 @sync_to_async
 def get_chat(chat_id, user):
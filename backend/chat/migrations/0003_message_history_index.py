@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chat", "0002_remove_chat_content_alter_chat_title_alter_chat_user_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                fields=["chat", "created_at", "id"], name="chat_message_history_idx"
+            ),
+        ),
+    ]
@@ -6,12 +6,37 @@ from django.contrib.auth.models import User
 # User = get_user_model()
 
 
+class ChatQuerySet(models.QuerySet):
+    def with_summary(self):
+        """
+        Annotate each chat with its message count and last message, so listing
+        chats takes a single query instead of two more per chat.
+        """
+        last_message = Message.objects.filter(chat=models.OuterRef("pk")).order_by(
+            "-created_at", "-id"
+        )
+        queryset = self
+        if not self.query.order_by:
+            # Meta.ordering is not applied to GROUP BY queries
+            queryset = self.order_by(*self.model._meta.ordering)
+        return queryset.annotate(
+            message_count=models.Count("messages"),
+            last_message_content=models.Subquery(last_message.values("content")[:1]),
+            last_message_sender=models.Subquery(last_message.values("sender")[:1]),
+            last_message_created_at=models.Subquery(
+                last_message.values("created_at")[:1]
+            ),
+        )
+
+
 class Chat(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="chats")
     title = models.CharField(max_length=255)
     created_at = models.DateTimeField(auto_now_add=True)
     is_active = models.BooleanField(default=True)
 
+    objects = ChatQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at"]
 
@@ -32,6 +57,12 @@ class Message(models.Model):
 
     class Meta:
         ordering = ["created_at"]
+        indexes = [
+            # Serves keyset pagination of a chat's history
+            models.Index(
+                fields=["chat", "created_at", "id"], name="chat_message_history_idx"
+            )
+        ]
 
     def __str__(self):
         return f"{self.sender}: {self.content[:30]}..."
@@ -0,0 +1,86 @@
+import base64
+from datetime import datetime
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+
+def encode_cursor(message) -> str:
+    position = f"{message.created_at.isoformat()}|{message.id}"
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        created_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        raise ValidationError({"cursor": "Invalid cursor."})
+
+
+class MessageKeysetPagination(BasePagination):
+    """
+    Keyset pagination over (created_at, id), served by the
+    (chat, created_at, id) index on Message.
+
+    - no parameters: the latest `limit` messages
+    - ?before=<cursor>: the `limit` messages before the cursor (older history)
+    - ?since=<cursor>: the messages after the cursor, for delta sync
+
+    Results are always in chronological order. "previous" is the cursor to
+    load older messages with (null at the start of the chat and for delta
+    syncs); "next" is the cursor of the newest message returned, to pass as
+    ?since= later, and "has_more" tells a delta sync to fetch again.
+    """
+
+    default_limit = 50
+    max_limit = 200
+
+    def paginate_queryset(self, queryset, request, view=None):
+        try:
+            limit = int(request.query_params.get("limit", self.default_limit))
+        except ValueError:
+            raise ValidationError({"limit": "Must be an integer."})
+        limit = max(1, min(limit, self.max_limit))
+        before = request.query_params.get("before")
+        since = request.query_params.get("since")
+        self.since = since
+
+        if since:
+            created_at, pk = decode_cursor(since)
+            queryset = queryset.filter(
+                Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+            ).order_by("created_at", "id")
+            page = list(queryset[: limit + 1])
+            self.has_more = len(page) > limit
+            page = page[:limit]
+            self.has_previous = False
+        else:
+            if before:
+                created_at, pk = decode_cursor(before)
+                queryset = queryset.filter(
+                    Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+                )
+            page = list(queryset.order_by("-created_at", "-id")[: limit + 1])
+            self.has_previous = len(page) > limit
+            page = page[:limit][::-1]
+            self.has_more = False
+
+        self.page = page
+        return page
+
+    def get_paginated_response(self, data):
+        newest = self.page[-1] if self.page else None
+        oldest = self.page[0] if self.page else None
+        return Response(
+            {
+                "results": data,
+                "previous": (
+                    encode_cursor(oldest) if oldest and self.has_previous else None
+                ),
+                # With nothing new, keep syncing from the cursor the client sent
+                "next": encode_cursor(newest) if newest else self.since,
+                "has_more": self.has_more,
+            }
+        )
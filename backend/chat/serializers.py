@@ -39,9 +39,20 @@ class ChatSerializer(serializers.ModelSerializer):
         read_only_fields = ["created_at", "user", "message_count", "last_message"]
 
     def get_message_count(self, obj):
+        # Annotated by Chat.objects.with_summary(); fall back for other querysets
+        if hasattr(obj, "message_count"):
+            return obj.message_count
         return obj.messages.count()
 
     def get_last_message(self, obj):
+        if hasattr(obj, "last_message_created_at"):
+            if obj.last_message_created_at is None:
+                return None
+            return {
+                "content": obj.last_message_content,
+                "sender": obj.last_message_sender,
+                "created_at": obj.last_message_created_at,
+            }
         last_message = obj.messages.last()
         if last_message:
             return {
@@ -6,6 +6,7 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from .models import Chat, Message
 from .serializers import ChatSerializer, MessageSerializer, UserSerializer
+from .pagination import MessageKeysetPagination
 from django.contrib.auth.models import User
 from agents.new_master_agent import MasterAgent
 from projects.models import Project
@@ -34,7 +35,9 @@ class ChatListCreateView(generics.ListCreateAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Chat.objects.filter(user=self.request.user, is_active=True)
+        return Chat.objects.filter(
+            user=self.request.user, is_active=True
+        ).with_summary()
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -45,12 +48,13 @@ class ChatDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Chat.objects.filter(user=self.request.user)
+        return Chat.objects.filter(user=self.request.user).with_summary()
 
 
 class MessageListCreateView(generics.ListCreateAPIView):
     serializer_class = MessageSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = MessageKeysetPagination
 
     def get_queryset(self):
         chat_pk = self.kwargs.get("chat_pk")
@@ -90,4 +94,4 @@ class AssistantResponseView(APIView):
         return Response(
             {"project_stage": project_stage},
             status=status.HTTP_200_OK,
-        )
\ No newline at end of file
+        )
@@ -76,6 +76,22 @@ MIDDLEWARE = [
 ROOT_URLCONF = "dev_ai.urls"
 ASGI_APPLICATION = "dev_ai.asgi.application"
 
+# Channel layer that routes chat messages and terminal logs to the sockets of
+# each chat. The in-memory layer only works within a single process; point
+# CHANNEL_LAYER_BACKEND at e.g. "channels_redis.core.RedisChannelLayer" and set
+# CHANNEL_LAYER_HOSTS to share groups between multiple server processes.
+CHANNEL_LAYERS = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CHANNEL_LAYER_BACKEND", "channels.layers.InMemoryChannelLayer"
+        ),
+    }
+}
+if os.getenv("CHANNEL_LAYER_HOSTS"):
+    CHANNEL_LAYERS["default"]["CONFIG"] = {
+        "hosts": os.getenv("CHANNEL_LAYER_HOSTS").split(",")
+    }
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
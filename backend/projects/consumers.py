@@ -1,12 +1,20 @@
+import json
 from channels.generic.websocket import AsyncWebsocketConsumer
 from utils.terminal_utils import TerminalLogger
 
 
 class TerminalConsumer(AsyncWebsocketConsumer):
     async def connect(self):
+        self.chat_id = self.scope["url_route"]["kwargs"]["chat_id"]
+        self.group_name = TerminalLogger.group_name(self.chat_id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
         await self.accept()
-        TerminalLogger.set_websocket(self)
-        await TerminalLogger.log("success", "Setup", "Connection Established!")
+        await TerminalLogger.log(
+            "success", "Setup", "Connection Established!", chat_id=self.chat_id
+        )
 
     async def disconnect(self, close_code):
-        TerminalLogger.clear_websocket()
+        await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def terminal_log(self, event):
+        await self.send(text_data=json.dumps(event["payload"]))
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0006_remove_project_development_stage_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="developmentstage",
+            name="layout",
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="project",
+            name="current_step",
+            field=models.CharField(
+                choices=[
+                    ("init", "Initial Prompt"),
+                    ("generate_mvp", "Generate MVP"),
+                    ("debate", "Critique MVP"),
+                    ("finalize_mvp", "Finalize MVP"),
+                    ("design", "Design Guidelines"),
+                    ("tech_stack", "Tech Stack Recommendation"),
+                    ("development", "Development"),
+                    ("test", "Testing"),
+                    ("deployment", "Deployment"),
+                    ("complete", "Completed"),
+                ],
+                default="init",
+                max_length=50,
+            ),
+        ),
+    ]
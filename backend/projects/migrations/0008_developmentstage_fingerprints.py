@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0007_developmentstage_layout_alter_project_current_step"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="developmentstage",
+            name="fingerprints",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0008_developmentstage_fingerprints"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="deploy_status",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("queued", "Queued"),
+                    ("pushing", "Pushing"),
+                    ("pages_building", "Pages Building"),
+                    ("live", "Live"),
+                    ("failed", "Failed"),
+                ],
+                max_length=20,
+                null=True,
+            ),
+        ),
+    ]
@@ -15,6 +15,14 @@ class AgentSteps(models.TextChoices):
     COMPLETE = "complete", "Completed"
 
 
+class DeployStatus(models.TextChoices):
+    QUEUED = "queued", "Queued"
+    PUSHING = "pushing", "Pushing"
+    PAGES_BUILDING = "pages_building", "Pages Building"
+    LIVE = "live", "Live"
+    FAILED = "failed", "Failed"
+
+
 class DevelopmentStage(models.Model):
     """
     Tracks development progress for a project.
@@ -26,6 +34,11 @@ class DevelopmentStage(models.Model):
     pages_approved = models.BooleanField(default=False)
     pages = models.JSONField(blank=True, null=True, default=list)
     prompts = models.JSONField(blank=True, null=True)
+    # Shared HTML shell (head, nav, footer) that every page's <main> is inserted into
+    layout = models.TextField(blank=True, null=True)
+    # Hashes of the inputs pages and layout were last generated from:
+    # {"layout": "<hash>", "pages": {"<page name>": "<hash>"}}
+    fingerprints = models.JSONField(blank=True, default=dict)
 
 
 class Project(models.Model):
@@ -42,6 +55,9 @@ class Project(models.Model):
     github_username = models.CharField(max_length=100, blank=True, null=True)
     github_repo_name = models.CharField(max_length=100, blank=True, null=True)
     deployed_url = models.URLField(blank=True, null=True)
+    deploy_status = models.CharField(
+        max_length=20, choices=DeployStatus.choices, blank=True, null=True
+    )
 
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -1,18 +1,36 @@
+import hashlib
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from .models import Project
 from rest_framework import status
 from .models import DevelopmentStage
+from utils.text_utils import page_filename
 
 
 @api_view(["GET"])
 def get_deployed_url(request, chat_id):
-    try:
-        project = Project.objects.get(chat__id=chat_id)
-        return Response({"deployed_url": project.deployed_url})
-    except Project.DoesNotExist:
+    """
+    Deployed URL and deploy status of a project. Status changes are pushed
+    over the chat WebSocket; clients that still poll should send the ETag
+    back in If-None-Match to get an empty 304 while nothing has changed.
+    """
+    state = (
+        Project.objects.filter(chat__id=chat_id)
+        .values("deployed_url", "deploy_status")
+        .first()
+    )
+    if state is None:
         return Response({"error": "Project not found"}, status=404)
 
+    digest = hashlib.sha256(
+        f"{state['deploy_status']}|{state['deployed_url']}".encode("utf-8")
+    ).hexdigest()
+    etag = f'"{digest[:32]}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in request.headers.get("If-None-Match", ""):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(state, headers=headers)
+
 
 @api_view(["PUT", "PATCH"])
 def update_development_stage_pages(request, chat_id):
@@ -29,7 +47,18 @@ def update_development_stage_pages(request, chat_id):
 
     data = request.data
     if data:
+        if not isinstance(data, list) or not all(
+            isinstance(page, dict) and page_filename(page.get("name")) for page in data
+        ):
+            return Response(
+                {"error": "Every page needs a name without path separators."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         dev_stage.pages = data
+        # Pages changed: rebuild their prompts and ask for approval again.
+        # Only pages whose fingerprint changed will be regenerated.
+        dev_stage.prompts = None
+        dev_stage.pages_approved = False
 
     try:
         dev_stage.save()
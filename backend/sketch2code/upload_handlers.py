@@ -0,0 +1,112 @@
+import os
+import uuid
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile, StopUpload
+from django.http import QueryDict
+from django.utils.datastructures import MultiValueDict
+from dotenv import load_dotenv, find_dotenv
+
+load_dotenv(find_dotenv(), override=True)
+
+SKETCH_UPLOAD_MAX_BYTES = int(os.getenv("SKETCH_UPLOAD_MAX_BYTES", 10 * 1024 * 1024))
+SKETCHES_DIR = os.path.join("media", "sketches")
+# Room for the chat_id and file_name fields and the multipart boundaries
+MULTIPART_OVERHEAD = 64 * 1024
+
+# File signatures of the formats the designer agent accepts
+IMAGE_SIGNATURES = {
+    b"\x89PNG\r\n\x1a\n": "png",
+    b"\xff\xd8\xff": "jpg",
+}
+
+
+def sniff_extension(header: bytes) -> str | None:
+    """Identify an image from its first bytes, without decoding it."""
+    for signature, ext in IMAGE_SIGNATURES.items():
+        if header.startswith(signature):
+            return ext
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+class SketchUploadedFile(UploadedFile):
+    """A sketch written to a hidden file in the sketches directory as it arrives."""
+
+    def __init__(self, path, name, content_type, charset, content_type_extra=None):
+        super().__init__(
+            open(path, "w+b"), name, content_type, 0, charset, content_type_extra
+        )
+        self.path = path
+        self.extension = None
+
+    def temporary_file_path(self):
+        return self.path
+
+    def discard(self):
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class SketchUploadHandler(FileUploadHandler):
+    """
+    Streams the "image" field of a sketch upload straight into media/sketches,
+    so the view only has to rename it into place. Uploads that are not
+    PNG/JPEG/WebP, judging by their first bytes, or that grow past
+    SKETCH_UPLOAD_MAX_BYTES are stopped while they are being received, and
+    the reason is left in self.error as (message, status).
+    """
+
+    def __init__(self, request=None, max_bytes: int = SKETCH_UPLOAD_MAX_BYTES):
+        super().__init__(request)
+        self.max_bytes = max_bytes
+        self.error = None
+        self.file = None
+
+    def handle_raw_input(
+        self, input_data, META, content_length, boundary, encoding=None
+    ):
+        # Refuse a body that is too large before reading any of it
+        if content_length > self.max_bytes + MULTIPART_OVERHEAD:
+            self.error = (f"Image is larger than {self.max_bytes} bytes", 413)
+            return QueryDict(encoding=encoding), MultiValueDict()
+        return None
+
+    def new_file(self, field_name, *args, **kwargs):
+        if field_name != "image" or self.file is not None:
+            raise SkipFile()
+        super().new_file(field_name, *args, **kwargs)
+        os.makedirs(SKETCHES_DIR, exist_ok=True)
+        self.file = SketchUploadedFile(
+            os.path.join(SKETCHES_DIR, f".{uuid.uuid4().hex}.upload"),
+            self.file_name,
+            self.content_type,
+            self.charset,
+            self.content_type_extra,
+        )
+
+    def receive_data_chunk(self, raw_data, start):
+        if start == 0:
+            self.file.extension = sniff_extension(raw_data[:12])
+            if self.file.extension is None:
+                self.error = ("Unsupported image format", 400)
+                raise StopUpload()
+        if start + len(raw_data) > self.max_bytes:
+            self.error = (f"Image is larger than {self.max_bytes} bytes", 413)
+            raise StopUpload(connection_reset=True)
+        self.file.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        self.file.seek(0)
+        self.file.size = file_size
+        return self.file
+
+    def upload_complete(self):
+        if self.error and self.file is not None:
+            self.file.discard()
+
+    def upload_interrupted(self):
+        if self.file is not None:
+            self.file.discard()
@@ -1,56 +1,111 @@
 import os
-import base64
-from rest_framework.decorators import api_view, permission_classes
+import re
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from rest_framework.decorators import api_view, permission_classes, parser_classes
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from PIL import Image
-from io import BytesIO
+from utils.text_utils import page_filename
+from .upload_handlers import SketchUploadHandler, SKETCHES_DIR
+
+THUMBNAIL_SIZE = (320, 320)
+
+# Thumbnails are generated off the request thread
+thumbnail_executor = ThreadPoolExecutor(max_workers=2)
+
+
+def make_thumbnail(source: str, target: str):
+    """Write a small PNG preview of a sketch."""
+    try:
+        with Image.open(source) as image:
+            image.draft("RGB", THUMBNAIL_SIZE)
+            image.thumbnail(THUMBNAIL_SIZE)
+            tmp_path = f"{target}.{uuid.uuid4().hex}.tmp"
+            image.save(tmp_path, "PNG", optimize=True)
+        os.replace(tmp_path, target)
+    except Exception as e:
+        print(f"⚠️ Could not create thumbnail for {source}: {e}")
 
 
 @api_view(["POST"])
 @permission_classes([AllowAny])
+@parser_classes([MultiPartParser])
 def upload_sketch(request):
     """
-    Accepts a base64-encoded image along with chat_id and file_name.
-    Saves it under media/sketches/<chat_id>/<file_name> and returns the relative path.
+    Accepts a multipart upload with an image file along with chat_id and file_name.
+    The image is streamed into media/sketches while it is received and then
+    moved to media/sketches/<chat_id>/<file_name>. Returns the relative path,
+    plus that of a preview thumbnail generated in the background.
     """
-    image_data = request.data.get("image")
+    handler = SketchUploadHandler(request._request)
+    request._request.upload_handlers = [handler]
+    image = request.FILES.get("image")
     chat_id = request.data.get("chat_id")
     file_name = request.data.get("file_name")
 
-    if not image_data or not chat_id or not file_name:
-        return Response(
-            {"error": "Missing required fields: image, chat_id, or file_name"},
-            status=400,
-        )
-
     try:
-        # Extract base64 part and file extension
-        format, imgstr = image_data.split(";base64,")
-        ext = format.split("/")[-1]
-        img_data = base64.b64decode(imgstr)
+        if handler.error:
+            message, status = handler.error
+            return Response({"error": message}, status=status)
+        if not image or not chat_id or not file_name:
+            return Response(
+                {"error": "Missing required fields: image, chat_id, or file_name"},
+                status=400,
+            )
+        if not str(chat_id).isdigit():
+            return Response({"error": "Invalid chat_id"}, status=400)
 
-        # Ensure directory exists
-        save_dir = os.path.join("media", "sketches", str(chat_id))
-        os.makedirs(save_dir, exist_ok=True)
-
-        # Normalize filename to avoid injection or bad chars
-        safe_name = os.path.splitext(file_name)[0]
-        safe_path = os.path.join(save_dir, f"{safe_name}.{ext}")
+        # Name the sketch after its page's HTML file so the generator can find it
+        page_file = page_filename(
+            re.sub(r"\.(png|jpe?g|webp)$", "", file_name, flags=re.IGNORECASE)
+        )
+        if page_file is None:
+            return Response({"error": "Invalid file_name"}, status=400)
+        safe_name = page_file.removesuffix(".html")
+        ext = image.extension
+        if ext is None:
+            return Response({"error": "Empty image"}, status=400)
 
-        # Save the image
-        image = Image.open(BytesIO(img_data))
-        image.save(safe_path)
+        # Reads the header only; raises on truncated headers and decompression bombs
+        image.close()
+        try:
+            with Image.open(image.temporary_file_path()) as header:
+                width, height = header.size
+        except (OSError, SyntaxError, Image.DecompressionBombError) as e:
+            return Response({"error": f"Invalid image: {e}"}, status=400)
+        if not width or not height:
+            return Response({"error": "Image has no pixels"}, status=400)
 
-        # Return relative path for future processing
-        relative_path = f"sketches/{chat_id}/{safe_name}.{ext}"
+        save_dir = os.path.join(SKETCHES_DIR, str(chat_id))
+        os.makedirs(os.path.join(save_dir, "thumbnails"), exist_ok=True)
 
-        return Response(
-            {
-                "message": "Image received and saved successfully.",
-                "filepath": relative_path,
-            }
-        )
+        # Drop sketches of the same page saved in another format
+        for other in ("png", "jpg", "jpeg", "webp"):
+            other_path = os.path.join(save_dir, f"{safe_name}.{other}")
+            if other != ext and os.path.exists(other_path):
+                os.remove(other_path)
 
+        # Same filesystem as the upload, so this is a rename and not a copy
+        safe_path = os.path.join(save_dir, f"{safe_name}.{ext}")
+        os.replace(image.temporary_file_path(), safe_path)
     except Exception as e:
         return Response({"error": str(e)}, status=500)
+    finally:
+        if image:
+            image.discard()
+
+    thumbnail_path = os.path.join(save_dir, "thumbnails", f"{safe_name}.png")
+    thumbnail_executor.submit(make_thumbnail, safe_path, thumbnail_path)
+
+    # Return relative path for future processing
+    return Response(
+        {
+            "message": "Image received and saved successfully.",
+            "filepath": f"sketches/{chat_id}/{safe_name}.{ext}",
+            "thumbnail": f"sketches/{chat_id}/thumbnails/{safe_name}.png",
+            "width": width,
+            "height": height,
+        }
+    )
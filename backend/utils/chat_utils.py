@@ -1,17 +1,20 @@
+import uuid
 from asgiref.sync import sync_to_async
+from channels.layers import get_channel_layer
 from chat.models import Message
 
 
 class ChatUtil:
-    _websocket = None
+    @staticmethod
+    def group_name(chat_id):
+        return f"chat_{chat_id}"
 
     @classmethod
-    def set_websocket(cls, websocket):
-        cls._websocket = websocket
-
-    @classmethod
-    def clear_websocket(cls):
-        cls._websocket = None
+    async def send_json(cls, chat_id, content):
+        """Send a frame to every socket connected to the chat."""
+        await get_channel_layer().group_send(
+            cls.group_name(chat_id), {"type": "chat.message", "content": content}
+        )
 
     @classmethod
     async def send_message(
@@ -23,10 +26,6 @@ class ChatUtil:
         ui_flags: dict | None = None,
         stage_data: dict | None = None,
     ):
-        if not cls._websocket:
-            print("Websocket not found!")
-            return
-
         extra_details = {
             "ui_flags": ui_flags or {},
             "stage_data": stage_data or {},
@@ -41,4 +40,70 @@ class ChatUtil:
         await sync_to_async(Message.objects.create)(
             chat=chat, sender="assistant", content=response_text
         )
-        await cls._websocket.send_json(message_content)
+        await cls.send_json(chat.id, message_content)
+
+    @classmethod
+    async def stream_message(
+        cls,
+        chat,
+        chunks,
+        is_seeking_approval,
+        project_stage,
+        ui_flags: dict | None = None,
+        stage_data: dict | None = None,
+        prefix: str = "",
+        suffix: str = "",
+    ) -> str:
+        """
+        Send a response as incremental frames while `chunks` (an async iterator
+        of text) is being generated. The complete message, wrapped in prefix and
+        suffix, is persisted once at the end. If the stream fails, an "error"
+        frame is sent instead and the exception is re-raised. Returns the
+        streamed text.
+        """
+        stream_id = uuid.uuid4().hex
+        streamed = []
+
+        async def send_frame(event, content):
+            await cls.send_json(
+                chat.id, {**content, "stream": {"id": stream_id, "event": event}}
+            )
+
+        await send_frame("start", {"project_stage": project_stage})
+        try:
+            if prefix:
+                await send_frame("delta", {"delta": prefix})
+            async for chunk in chunks:
+                streamed.append(chunk)
+                await send_frame("delta", {"delta": chunk})
+        except BaseException:
+            # Let clients drop the partial reply; nothing was persisted
+            await send_frame("error", {})
+            raise
+
+        content = "".join(streamed)
+        response_text = f"{prefix}{content}{suffix}"
+        message_content = {
+            "response": response_text,
+            "is_seeking_approval": is_seeking_approval,
+            "project_stage": project_stage,
+            "extra_details": {
+                "ui_flags": ui_flags or {},
+                "stage_data": stage_data or {},
+            },
+        }
+        await sync_to_async(Message.objects.create)(
+            chat=chat, sender="assistant", content=response_text
+        )
+        await send_frame("end", message_content)
+        return content
+
+    @classmethod
+    async def send_job_status(cls, job):
+        await cls.send_json(job.chat_id, {"job": job.to_dict()})
+
+    @classmethod
+    async def send_deploy_status(cls, chat_id, status, deployed_url=None):
+        await cls.send_json(
+            chat_id, {"deploy": {"status": status, "deployed_url": deployed_url}}
+        )
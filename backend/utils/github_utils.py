@@ -17,3 +17,27 @@ def github_repo_exists(username, repo_name):
         return response.status_code == 200
     except requests.RequestException:
         return False
+
+
+def github_branch_exists(username, repo_name, branch):
+    try:
+        response = requests.get(
+            f"https://api.github.com/repos/{username}/{repo_name}/branches/{branch}",
+            timeout=5,
+        )
+        return response.status_code == 200
+    except requests.RequestException:
+        return False
+
+
+def github_pages_ready(username, repo_name):
+    """Check whether the GitHub Pages site of a repo is being served."""
+    try:
+        response = requests.head(
+            f"https://{username}.github.io/{repo_name}/",
+            timeout=5,
+            allow_redirects=True,
+        )
+        return response.status_code == 200
+    except requests.RequestException:
+        return False
@@ -0,0 +1,116 @@
+"""Incremental extraction of an HTML element from a streamed LLM response."""
+
+import re
+from html.parser import HTMLParser
+
+VOID_ELEMENTS = {
+    "area",
+    "base",
+    "br",
+    "col",
+    "embed",
+    "hr",
+    "img",
+    "input",
+    "link",
+    "meta",
+    "source",
+    "track",
+    "wbr",
+}
+
+
+class _TagBalance(HTMLParser):
+    """Tracks open tags as HTML is fed in, recording mismatched closing tags."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.stack = []
+        self.errors = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag not in VOID_ELEMENTS:
+            self.stack.append(tag)
+
+    def handle_endtag(self, tag):
+        if tag in VOID_ELEMENTS:
+            return
+        if tag not in self.stack:
+            self.errors.append(f"Unexpected </{tag}>")
+            return
+        # Implicitly close anything left open inside this element
+        while self.stack[-1] != tag:
+            self.errors.append(f"Unclosed <{self.stack.pop()}>")
+        self.stack.pop()
+
+
+class HTMLStreamExtractor:
+    """
+    Consumes model output chunk by chunk and returns only the HTML of the
+    root element (a full document for "html", or e.g. the "main" element).
+    Chatter and markdown fences before and after the element are dropped.
+    """
+
+    def __init__(self, root: str = "html"):
+        self.root = root
+        if root == "html":
+            self._start = re.compile(r"<!doctype html|<html\b", re.IGNORECASE)
+        else:
+            self._start = re.compile(rf"<{root}\b", re.IGNORECASE)
+        self._end = re.compile(rf"</{root}\s*>", re.IGNORECASE)
+        # Longest marker that could be split across two chunks
+        self._holdback = max(len("<!doctype html"), len(root) + 4)
+        self._pending = ""
+        self._balance = _TagBalance()
+        self.started = False
+        self.finished = False
+
+    def feed(self, chunk: str) -> str:
+        """Add a chunk of model output and return the HTML that is now final."""
+        if self.finished or not chunk:
+            return ""
+        self._pending += chunk
+
+        if not self.started:
+            match = self._start.search(self._pending)
+            if not match:
+                # Keep only a tail that could be the beginning of the marker
+                self._pending = self._pending[-self._holdback :]
+                return ""
+            self.started = True
+            self._pending = self._pending[match.start() :]
+
+        match = self._end.search(self._pending)
+        if match:
+            self.finished = True
+            return self._emit(self._pending[: match.end()])
+
+        # Hold back a tail that could be the beginning of the closing tag
+        cut = max(len(self._pending) - self._holdback, 0)
+        return self._emit(self._pending[:cut], self._pending[cut:])
+
+    def close(self) -> str:
+        """Flush what is left once the stream ends without a closing tag."""
+        if not self.started or self.finished:
+            return ""
+        self.finished = True
+        tail = re.sub(r"\s*```\s*$", "", self._pending)
+        return self._emit(tail)
+
+    def _emit(self, text: str, pending: str = "") -> str:
+        self._pending = pending
+        if text:
+            self._balance.feed(text)
+        return text
+
+    @property
+    def errors(self) -> list:
+        """Structural problems found so far, including tags still left open."""
+        errors = list(self._balance.errors)
+        if self.finished:
+            errors += [f"Unclosed <{tag}>" for tag in self._balance.stack]
+        return errors
+
+    @property
+    def is_balanced(self) -> bool:
+        return self.finished and not self.errors
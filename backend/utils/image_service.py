@@ -0,0 +1,160 @@
+"""Client for the local image service with keyword extraction, caching and batching."""
+
+import os
+import re
+import json
+import asyncio
+import weakref
+from collections import Counter
+import httpx
+from dotenv import load_dotenv, find_dotenv
+from utils.llm_cache import MemoryStore
+
+load_dotenv(find_dotenv(), override=True)
+
+IMAGE_SERVICE_URL = os.getenv("IMAGE_SERVICE_URL", "http://localhost:8001")
+IMAGE_SERVICE_TIMEOUT = float(os.getenv("IMAGE_SERVICE_TIMEOUT", 20))
+# Seconds a tag's image URLs are reused before the service is asked again
+IMAGE_CACHE_TTL = int(os.getenv("IMAGE_CACHE_TTL", 24 * 60 * 60))
+# Seconds to collect tag lookups from concurrent projects into one request
+IMAGE_BATCH_WINDOW = float(os.getenv("IMAGE_BATCH_WINDOW", 0.05))
+
+STOP_WORDS = set("""
+    a about above after again against all allow allows also am an and any app
+    application are as at be because been before being below between both but
+    by can could create did do does doing down during each easy easily etc few
+    for from further get gets had has have having he her here hers him his how
+    i if in into is it its itself just let lets like make makes me more most
+    my new no nor not now of off on once only or other our out over own people
+    platform provide provides same she should simple so some such than that
+    the their them then there these they this those through to too under until
+    up us use used user users using very via want was way we web website were
+    what when where which while who whom why will with within without would
+    you your site online based help helps page pages feature features
+    customer customers service services sell selling buy order orders view
+    browse book manage track find share offer offers include includes plan
+    plans
+    """.split())
+
+
+def extract_keywords(text: str, count: int = 3) -> list:
+    """
+    Pick the most descriptive words of a text with RAKE: candidate phrases are
+    runs of words between stop words and punctuation, and a word scores higher
+    the more often it co-occurs in long phrases relative to its frequency.
+    """
+    phrases = []
+    for fragment in re.split(r"[^\w\s'-]|\n", text.lower()):
+        phrase = []
+        for word in re.findall(r"[a-z][a-z'-]+", fragment):
+            word = word.strip("'-")
+            if word in STOP_WORDS or len(word) < 3:
+                if phrase:
+                    phrases.append(phrase)
+                phrase = []
+            else:
+                phrase.append(word)
+        if phrase:
+            phrases.append(phrase)
+
+    frequency, degree, position = Counter(), Counter(), {}
+    for phrase in phrases:
+        for word in phrase:
+            frequency[word] += 1
+            degree[word] += len(phrase)
+            position.setdefault(word, len(position))
+
+    # Ties go to the word mentioned first, usually the subject of the site
+    ranked = sorted(
+        frequency,
+        key=lambda word: (
+            -(degree[word] / frequency[word] + frequency[word]),
+            position[word],
+        ),
+    )
+    return ranked[:count]
+
+
+class _Batch:
+    """Tag lookups of one event loop that are waiting to be sent together."""
+
+    def __init__(self):
+        self.client = httpx.AsyncClient(
+            base_url=IMAGE_SERVICE_URL,
+            timeout=IMAGE_SERVICE_TIMEOUT,
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+        )
+        self.pending = {}
+        self.flush_handle = None
+
+
+class ImageService:
+    """
+    Looks up image URLs by tag. Results are cached per tag with a TTL, and
+    lookups that arrive within IMAGE_BATCH_WINDOW of each other (typically
+    from projects being generated at the same time) share one request over
+    a pooled connection.
+    """
+
+    def __init__(self, ttl: int = IMAGE_CACHE_TTL, window: float = IMAGE_BATCH_WINDOW):
+        self.ttl = ttl
+        self.window = window
+        self.cache = MemoryStore()
+        # httpx clients and futures are bound to the loop that created them
+        self._batches = weakref.WeakKeyDictionary()
+
+    def _batch(self) -> _Batch:
+        loop = asyncio.get_running_loop()
+        batch = self._batches.get(loop)
+        if batch is None:
+            batch = self._batches[loop] = _Batch()
+        return batch
+
+    async def get_images(self, tags: list) -> dict:
+        """Map each tag to its image URLs."""
+        results, waiting = {}, {}
+        batch = self._batch()
+        for tag in dict.fromkeys(tags):
+            cached = self.cache.get(tag)
+            if cached is not None:
+                results[tag] = json.loads(cached)
+                continue
+            if tag not in batch.pending:
+                batch.pending[tag] = asyncio.get_running_loop().create_future()
+            waiting[tag] = batch.pending[tag]
+
+        if waiting:
+            print(f"🖼️ Image cache miss for {list(waiting)}")
+            if batch.flush_handle is None:
+                batch.flush_handle = asyncio.get_running_loop().call_later(
+                    self.window, lambda: asyncio.ensure_future(self._flush(batch))
+                )
+            for tag, future in waiting.items():
+                # shield: a cancelled caller must not cancel a lookup others share
+                results[tag] = await asyncio.shield(future)
+        return {tag: results[tag] for tag in dict.fromkeys(tags)}
+
+    async def _flush(self, batch: _Batch):
+        pending, batch.pending, batch.flush_handle = batch.pending, {}, None
+        try:
+            response = await batch.client.post(
+                "/get_images", json={"tags": list(pending)}
+            )
+            response.raise_for_status()
+            data = response.json()
+        except Exception as e:
+            error = RuntimeError(f"Image service request failed: {e}")
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        for tag, future in pending.items():
+            urls = data.get(tag, [])
+            if urls:
+                self.cache.set(tag, json.dumps(urls), self.ttl)
+            if not future.done():
+                future.set_result(urls)
+
+
+image_service = ImageService()
@@ -0,0 +1,143 @@
+"""In-process job queue that runs chat turns outside of the WebSocket receive loop."""
+
+import os
+import uuid
+import asyncio
+from collections import deque
+from datetime import datetime
+from dotenv import load_dotenv, find_dotenv
+
+load_dotenv(find_dotenv(), override=True)
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 4))
+
+
+class JobStatus:
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class Job:
+    def __init__(self, chat_id, func, args, notify=None):
+        self.id = uuid.uuid4().hex
+        self.chat_id = str(chat_id)
+        self.func = func
+        self.args = args
+        self.notify = notify
+        self.status = JobStatus.QUEUED
+        self.error = None
+        self.created_at = datetime.now()
+        self.task = None
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "chat_id": self.chat_id,
+            "status": self.status,
+            "error": self.error,
+            "created_at": self.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+
+
+class JobQueue:
+    """
+    Job queue drained by a pool of asyncio workers. Jobs of the same chat run
+    one at a time and in submission order; different chats run concurrently.
+    Workers share the event loop with the sockets, so jobs must run blocking
+    calls in a thread (asyncio.to_thread / sync_to_async).
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS):
+        self.workers = workers
+        self._jobs = {}
+        # Pending jobs per chat, and the queue of chats that have work to do
+        self._pending = {}
+        self._ready = None
+        self._worker_tasks = []
+
+    def _ensure_workers(self):
+        if self._worker_tasks and not all(t.done() for t in self._worker_tasks):
+            return
+        self._ready = asyncio.Queue()
+        self._pending = {}
+        self._worker_tasks = [
+            asyncio.create_task(self._worker()) for _ in range(self.workers)
+        ]
+
+    async def submit(self, chat_id, func, *args, notify=None) -> Job:
+        """Queue func(*args) for a chat. notify(job) is awaited on every status change."""
+        self._ensure_workers()
+        job = Job(chat_id, func, args, notify)
+        self._jobs[job.id] = job
+        await self._update(job, JobStatus.QUEUED)
+
+        # A chat is in the ready queue (or being worked on) while it has jobs
+        if job.chat_id not in self._pending:
+            self._pending[job.chat_id] = deque()
+            self._ready.put_nowait(job.chat_id)
+        self._pending[job.chat_id].append(job)
+        return job
+
+    def get(self, job_id) -> Job | None:
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id, chat_id=None) -> bool:
+        """
+        Cancel a queued or running job. When chat_id is given, only a job of
+        that chat is cancelled. Returns False if there was nothing to cancel.
+        """
+        job = self._jobs.get(job_id)
+        if job is None or (chat_id is not None and job.chat_id != str(chat_id)):
+            return False
+        if job.status not in (JobStatus.QUEUED, JobStatus.RUNNING):
+            return False
+        if job.task:
+            job.task.cancel()
+        else:
+            job.status = JobStatus.CANCELLED
+            if job.notify:
+                asyncio.create_task(job.notify(job))
+        return True
+
+    async def _update(self, job: Job, status: str, error: str | None = None):
+        job.status = status
+        job.error = error
+        if job.notify:
+            try:
+                await job.notify(job)
+            except Exception as e:
+                print(f"Failed to report status of job {job.id}: {e}")
+
+    async def _worker(self):
+        while True:
+            chat_id = await self._ready.get()
+            pending = self._pending[chat_id]
+            job = pending.popleft()
+            try:
+                if job.status != JobStatus.CANCELLED:
+                    await self._run(job)
+            finally:
+                self._jobs.pop(job.id, None)
+                if pending:
+                    self._ready.put_nowait(chat_id)
+                else:
+                    del self._pending[chat_id]
+
+    async def _run(self, job: Job):
+        job.task = asyncio.create_task(job.func(*job.args))
+        await self._update(job, JobStatus.RUNNING)
+        try:
+            await job.task
+        except asyncio.CancelledError:
+            await self._update(job, JobStatus.CANCELLED)
+        except Exception as e:
+            print(f"Job {job.id} failed: {e}")
+            await self._update(job, JobStatus.FAILED, str(e))
+        else:
+            await self._update(job, JobStatus.SUCCEEDED)
+
+
+job_queue = JobQueue()
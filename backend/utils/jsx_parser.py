@@ -0,0 +1,319 @@
+"""Extraction of complete source files from multi-file LLM responses for React code."""
+
+import re
+
+FENCE_PATTERN = re.compile(r"^[ \t]*```([^\n`]*)\n(.*?)^[ \t]*```[ \t]*$", re.M | re.S)
+FILENAME_PATTERN = re.compile(r"[\w./-]+\.(?:jsx|js|tsx|ts|css|json)\b")
+WRITE_FILE_PATTERN = re.compile(r"write_file\s*\(")
+
+# Characters after which a "<" starts JSX and a "/" starts a regex, not an operator
+EXPRESSION_START = set("(,=:[!&|?{};>+-*%~^") | {""}
+EXPRESSION_KEYWORDS = {"return", "case", "default", "yield", "await", "typeof"}
+
+
+def _skip_string(code: str, i: int) -> int:
+    """Index just past the string literal starting at code[i]."""
+    quote = code[i]
+    i += 1
+    while i < len(code):
+        if code[i] == "\\":
+            i += 2
+            continue
+        if code[i] == quote or (code[i] == "\n" and quote != "`"):
+            return i + 1
+        i += 1
+    return i
+
+
+def _skip_regex(code: str, i: int) -> int:
+    """Index just past the regex literal starting at code[i]."""
+    i += 1
+    in_class = False
+    while i < len(code) and code[i] != "\n":
+        char = code[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == "[":
+            in_class = True
+        elif char == "]":
+            in_class = False
+        elif char == "/" and not in_class:
+            i += 1
+            while i < len(code) and code[i].isalpha():
+                i += 1
+            return i
+        i += 1
+    return i
+
+
+class _Scanner:
+    """
+    Minimal JavaScript/JSX tokenizer that tracks nesting across strings,
+    template literals, comments, regex literals and JSX (whose text may
+    contain unbalanced quotes and braces-free prose).
+    """
+
+    def __init__(self, code: str):
+        self.code = code
+        self.i = 0
+        # Frames: ("js", brace_depth) | ("template",) | ("tag",) | ("children",)
+        self.stack = [["js", 0]]
+        self.previous = ""
+
+    @property
+    def at_top_level(self) -> bool:
+        return len(self.stack) == 1 and self.stack[0][1] == 0
+
+    def _previous_word(self) -> str:
+        match = re.search(r"([A-Za-z_$][\w$]*)\s*$", self.code[: self.i])
+        return match.group(1) if match else ""
+
+    def _starts_expression(self) -> bool:
+        return (
+            self.previous in EXPRESSION_START
+            or self._previous_word() in EXPRESSION_KEYWORDS
+        )
+
+    def step(self):
+        """Consume one token."""
+        code, i = self.code, self.i
+        frame = self.stack[-1]
+        char = code[i]
+
+        if frame[0] == "template":
+            if char == "\\":
+                self.i += 2
+            elif char == "`":
+                self.stack.pop()
+                self.i += 1
+                self.previous = "`"
+            elif code.startswith("${", i):
+                self.stack.append(["js", 0])
+                self.i += 2
+            else:
+                self.i += 1
+            return
+
+        if frame[0] == "children":
+            if char == "{":
+                self.stack.append(["js", 0])
+                self.i += 1
+            elif code.startswith("</", i):
+                # Closing tag: consume it and leave the element
+                end = code.find(">", i)
+                self.i = len(code) if end == -1 else end + 1
+                self.stack.pop()
+                self.previous = ">"
+            elif char == "<":
+                self.stack.append(["tag"])
+                self.i += 1
+            else:
+                self.i += 1
+            return
+
+        if frame[0] == "tag":
+            if char in "\"'":
+                self.i = _skip_string(code, i)
+            elif char == "{":
+                self.stack.append(["js", 0])
+                self.i += 1
+            elif code.startswith("/>", i):
+                self.stack.pop()
+                self.i += 2
+                self.previous = ">"
+            elif char == ">":
+                self.stack[-1] = ["children"]
+                self.i += 1
+            else:
+                self.i += 1
+            return
+
+        # JavaScript
+        if code.startswith("//", i):
+            end = code.find("\n", i)
+            self.i = len(code) if end == -1 else end
+        elif code.startswith("/*", i):
+            end = code.find("*/", i + 2)
+            self.i = len(code) if end == -1 else end + 2
+        elif char in "\"'":
+            self.i = _skip_string(code, i)
+            self.previous = char
+        elif char == "`":
+            self.stack.append(["template"])
+            self.i += 1
+        elif char == "/" and self._starts_expression():
+            self.i = _skip_regex(code, i)
+            self.previous = "/"
+        elif (
+            char == "<"
+            and self._starts_expression()
+            and i + 1 < len(code)
+            and (code[i + 1].isalpha() or code[i + 1] == ">")
+        ):
+            self.stack.append(["tag"])
+            self.i += 1
+        elif char in "{([":
+            frame[1] += 1
+            self.i += 1
+            self.previous = char
+        elif char in "})]":
+            if frame[1] == 0 and len(self.stack) > 1:
+                # End of a ${...} or {...} embedded in a template or JSX
+                self.stack.pop()
+            else:
+                frame[1] = max(frame[1] - 1, 0)
+            self.i += 1
+            self.previous = char
+        else:
+            if not char.isspace():
+                self.previous = char if not (char.isalnum() or char in "_$") else "a"
+            self.i += 1
+
+
+def find_module_end(code: str, start: int = 0) -> int:
+    """
+    Find where a JS/JSX module starting at code[start] ends: after its
+    top-level `export default ...` statement, or at a closing code fence.
+    Falls back to the end of the text.
+    """
+    scanner = _Scanner(code)
+    scanner.i = start
+    export_seen = False
+    while scanner.i < len(code):
+        i = scanner.i
+        if scanner.at_top_level:
+            line_start = i == 0 or code[i - 1] == "\n"
+            if line_start and code.startswith("```", i):
+                return i
+            if code.startswith("export default", i):
+                export_seen = True
+            elif export_seen and code[i] in ";\n":
+                # The default export statement is complete
+                return i + 1 if code[i] == ";" else i
+        scanner.step()
+    return len(code)
+
+
+def _unescape(text: str) -> str:
+    return re.sub(
+        r"\\(.)",
+        lambda m: {"n": "\n", "t": "\t", "r": "\r"}.get(m.group(1), m.group(1)),
+        text,
+        flags=re.S,
+    )
+
+
+def _string_argument(args: str, name: str, position: int) -> str | None:
+    """Value of a string argument given by keyword or position in a call."""
+    keyword = re.search(rf"\b{name}\s*=\s*", args)
+    literals = []
+    i = 0
+    while i < len(args):
+        if args[i] in "\"'`":
+            quote = args[i]
+            if args.startswith(quote * 3, i):
+                end = args.find(quote * 3, i + 3)
+                end = len(args) if end == -1 else end
+                literals.append((i, args[i + 3 : end]))
+                i = end + 3
+            else:
+                end = _skip_string(args, i)
+                literals.append((i, _unescape(args[i + 1 : end - 1])))
+                i = end
+        else:
+            i += 1
+
+    if keyword:
+        for index, value in literals:
+            if index == keyword.end():
+                return value
+        return None
+    return literals[position][1] if len(literals) > position else None
+
+
+def parse_write_file_calls(text: str) -> dict:
+    """Files written through write_file(file_path=..., content=...) calls in the text."""
+    files = {}
+    for match in WRITE_FILE_PATTERN.finditer(text):
+        # Find the closing parenthesis while skipping over string literals
+        i, depth = match.end(), 1
+        while i < len(text) and depth:
+            if text[i] in "\"'`":
+                quote = text[i]
+                if text.startswith(quote * 3, i):
+                    end = text.find(quote * 3, i + 3)
+                    i = len(text) if end == -1 else end + 3
+                else:
+                    i = _skip_string(text, i)
+                continue
+            depth += {"(": 1, ")": -1}.get(text[i], 0)
+            i += 1
+        args = text[match.end() : i - 1]
+        path = _string_argument(args, "file_path", 0)
+        content = _string_argument(args, "content", 1)
+        if path and content:
+            files[path.lstrip("./")] = content.strip("\n") + "\n"
+    return files
+
+
+def parse_fenced_files(text: str) -> dict:
+    """
+    Files given as fenced code blocks named in the info string
+    (```jsx Header.jsx) or on the line just before the fence.
+    """
+    files = {}
+    for match in FENCE_PATTERN.finditer(text):
+        info, body = match.group(1), match.group(2)
+        name = FILENAME_PATTERN.search(info)
+        if not name:
+            before = text[: match.start()].rstrip().rsplit("\n", 1)[-1]
+            name = FILENAME_PATTERN.search(before)
+        if not name:
+            first_line = body.lstrip().split("\n", 1)[0]
+            if first_line.startswith("//"):
+                name = FILENAME_PATTERN.search(first_line)
+        if name:
+            files[name.group(0).lstrip("./")] = body
+    return files
+
+
+def extract_component_source(text: str, name: str) -> str | None:
+    """
+    Last resort for an unstructured response: find the module that declares
+    the component and cut it at its real end using the tokenizer.
+    """
+    declaration = re.search(
+        rf"(?:function\s+{name}\b|(?:const|let|class)\s+{name}\b)", text
+    )
+    if not declaration:
+        return None
+    # Include the imports that precede the declaration
+    start = declaration.start()
+    imports = list(re.finditer(r"^import\s", text[:start], re.M))
+    if imports:
+        fence = text.rfind("```", 0, start)
+        candidates = [m.start() for m in imports if m.start() > fence]
+        if candidates:
+            start = candidates[0]
+    end = find_module_end(text, start)
+    return text[start:end].strip() + "\n"
+
+
+def extract_files(text: str, expected: list = ()) -> dict:
+    """
+    Extract every file from a multi-file response, keyed by path. Structured
+    write_file calls and named fences are preferred; expected files that are
+    still missing are recovered with the JSX boundary detector.
+    """
+    files = parse_write_file_calls(text)
+    for path, content in parse_fenced_files(text).items():
+        files.setdefault(path, content)
+
+    for path in expected:
+        if any(found.rsplit("/", 1)[-1] == path for found in files):
+            continue
+        source = extract_component_source(text, path.rsplit(".", 1)[0])
+        if source:
+            files[path] = source
+    return files
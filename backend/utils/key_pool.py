@@ -0,0 +1,237 @@
+"""Quota-aware scheduler for the pool of Gemini API keys."""
+
+import os
+import re
+import time
+import asyncio
+import itertools
+import threading
+from collections import deque
+from dotenv import load_dotenv, find_dotenv
+
+load_dotenv(find_dotenv(), override=True)
+
+GEMINI_RPM_LIMIT = int(os.getenv("GEMINI_RPM_LIMIT", 15))
+GEMINI_TPM_LIMIT = int(os.getenv("GEMINI_TPM_LIMIT", 1_000_000))
+GEMINI_KEY_COOLDOWN = float(os.getenv("GEMINI_KEY_COOLDOWN", 60))
+# Retries for temporary server errors (500/503 "overloaded" and the like)
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", 2))
+GEMINI_RETRY_BACKOFF = float(os.getenv("GEMINI_RETRY_BACKOFF", 1))
+
+WINDOW_SECONDS = 60
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Check whether an exception raised by a Gemini client is a 429/quota error."""
+    if getattr(error, "code", None) == 429:
+        return True
+    text = f"{type(error).__name__} {error}"
+    return (
+        "429" in text
+        or "ResourceExhausted" in text
+        or "RESOURCE_EXHAUSTED" in text
+        or "quota" in text.lower()
+    )
+
+
+def is_transient_error(error: Exception) -> bool:
+    """Check whether an exception is a temporary 5xx error worth retrying."""
+    code = getattr(error, "code", None)
+    if isinstance(code, int) and 500 <= code < 600:
+        return True
+    text = f"{type(error).__name__} {error}"
+    return bool(
+        re.search(r"\b50[0234]\b", text)
+        or any(
+            marker in text
+            for marker in (
+                "UNAVAILABLE",
+                "ServiceUnavailable",
+                "InternalServerError",
+                "DeadlineExceeded",
+                "overloaded",
+            )
+        )
+    )
+
+
+class KeyState:
+    """Sliding-window usage of a single API key."""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.requests = deque()
+        self.tokens = deque()
+        self.token_total = 0
+        self.parked_until = 0.0
+
+    def prune(self, now: float):
+        while self.requests and self.requests[0] <= now - WINDOW_SECONDS:
+            self.requests.popleft()
+        while self.tokens and self.tokens[0][0] <= now - WINDOW_SECONDS:
+            self.token_total -= self.tokens.popleft()[1]
+
+    def wait_time(self, now: float, tokens: int, rpm_limit: int, tpm_limit: int):
+        """Seconds until this key can take a request of the given size."""
+        waits = [self.parked_until - now]
+        if len(self.requests) >= rpm_limit:
+            waits.append(self.requests[0] + WINDOW_SECONDS - now)
+        if self.token_total + tokens > tpm_limit and self.tokens:
+            waits.append(self.tokens[0][0] + WINDOW_SECONDS - now)
+        return max(0.0, *waits)
+
+    def headroom(self, rpm_limit: int, tpm_limit: int) -> float:
+        """Fraction of the tighter of the two quotas still available."""
+        return min(1 - len(self.requests) / rpm_limit, 1 - self.token_total / tpm_limit)
+
+
+class KeyPool:
+    """
+    Routes each call to the key with the most request/token headroom and parks
+    keys that hit a 429 for a cooldown period.
+    """
+
+    def __init__(
+        self,
+        keys,
+        rpm_limit: int = GEMINI_RPM_LIMIT,
+        tpm_limit: int = GEMINI_TPM_LIMIT,
+        cooldown: float = GEMINI_KEY_COOLDOWN,
+        retries: int = GEMINI_MAX_RETRIES,
+        backoff: float = GEMINI_RETRY_BACKOFF,
+    ):
+        self.keys = [key for key in keys if key]
+        self.rpm_limit = rpm_limit
+        self.tpm_limit = tpm_limit
+        self.cooldown = cooldown
+        self.retries = retries
+        self.backoff = backoff
+        self._states = {key: KeyState(key) for key in self.keys}
+        self._lock = threading.Lock()
+
+    def _try_acquire(self, tokens: int):
+        """Reserve capacity on the best key. Returns (key, 0) or (None, wait_seconds)."""
+        if not self.keys:
+            raise RuntimeError("No Gemini API keys configured.")
+
+        now = time.monotonic()
+        with self._lock:
+            available = []
+            min_wait = None
+            for state in self._states.values():
+                state.prune(now)
+                wait = state.wait_time(now, tokens, self.rpm_limit, self.tpm_limit)
+                if wait == 0:
+                    available.append(state)
+                elif min_wait is None or wait < min_wait:
+                    min_wait = wait
+
+            if not available:
+                return None, min_wait
+
+            state = max(
+                available, key=lambda s: s.headroom(self.rpm_limit, self.tpm_limit)
+            )
+            state.requests.append(now)
+            state.tokens.append((now, tokens))
+            state.token_total += tokens
+            return state.key, 0
+
+    def acquire(self, tokens: int = 0) -> str:
+        """
+        Block until a key has capacity for the request and return it. This
+        sleeps the calling thread; use aacquire() on the event loop.
+        """
+        while True:
+            key, wait = self._try_acquire(tokens)
+            if key:
+                return key
+            time.sleep(wait)
+
+    async def aacquire(self, tokens: int = 0) -> str:
+        """Wait (without blocking the event loop) until a key has capacity."""
+        while True:
+            key, wait = self._try_acquire(tokens)
+            if key:
+                return key
+            await asyncio.sleep(wait)
+
+    def record_usage(self, key: str, estimated: int, actual: int | None):
+        """Replace the token estimate reserved by acquire() with the real usage."""
+        if actual is None or key not in self._states:
+            return
+        with self._lock:
+            state = self._states[key]
+            state.tokens.append((time.monotonic(), actual - estimated))
+            state.token_total += actual - estimated
+
+    def park(self, key: str, cooldown: float | None = None):
+        """Take a key out of rotation after it was rate limited."""
+        if key not in self._states:
+            return
+        cooldown = self.cooldown if cooldown is None else cooldown
+        with self._lock:
+            self._states[key].parked_until = time.monotonic() + cooldown
+        print(f"⏳ Gemini key ...{key[-4:]} rate limited, parked for {cooldown}s")
+
+    def recover(self, key: str, error: Exception, attempt: int) -> float | None:
+        """
+        Decide whether a failed call is tried again. Rate limited keys are
+        parked so the next attempt fails over to another key, and temporary
+        server errors are retried with exponential backoff. Returns the
+        seconds to wait before the next attempt, or None to give up.
+        """
+        if is_rate_limit_error(error):
+            if attempt < len(self.keys):
+                self.park(key)
+                return 0.0
+            return None
+        if is_transient_error(error) and attempt < self.retries:
+            delay = self.backoff * 2**attempt
+            print(f"🔁 Gemini server error, retrying in {delay}s: {error}")
+            return delay
+        return None
+
+    def run(self, call, tokens: int = 0, usage=None):
+        """
+        Run call(key) on the best available key, failing over to the next key
+        on rate limit errors and retrying server errors. usage(result) may
+        return the real token count.
+        """
+        for attempt in itertools.count():
+            key = self.acquire(tokens)
+            try:
+                result = call(key)
+            except Exception as e:
+                delay = self.recover(key, e, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+            self.record_usage(key, tokens, usage(result) if usage else None)
+            return result
+
+    async def arun(self, call, tokens: int = 0, usage=None):
+        """Async variant of run() where call(key) returns an awaitable."""
+        for attempt in itertools.count():
+            key = await self.aacquire(tokens)
+            try:
+                result = await call(key)
+            except Exception as e:
+                delay = self.recover(key, e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            self.record_usage(key, tokens, usage(result) if usage else None)
+            return result
+
+
+# List of keys
+API_KEYS = [
+    os.getenv("GOOGLE_API_KEY"),
+    os.getenv("GOOGLE_API_KEY_2"),
+    os.getenv("GOOGLE_API_KEY_3"),
+]
+
+key_pool = KeyPool(API_KEYS)
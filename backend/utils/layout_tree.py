@@ -0,0 +1,149 @@
+"""Infers a nested row/column layout from the bounding boxes detected on a sketch."""
+
+import json
+import numpy as np
+
+# Boxes may overlap by this fraction of the median element size and still be
+# considered separate rows/columns (hand-drawn boxes rarely line up exactly)
+OVERLAP_TOLERANCE = 0.15
+# Detections of the same region with at least this IoU are duplicates
+DUPLICATE_IOU = 0.6
+
+
+def _as_arrays(elements: list) -> tuple[np.ndarray, np.ndarray]:
+    boxes = np.array(
+        [[e["xmin"], e["ymin"], e["xmax"], e["ymax"]] for e in elements],
+        dtype=np.float64,
+    ).reshape(-1, 4)
+    scores = np.array([e.get("confidence", 1.0) for e in elements], dtype=np.float64)
+    return boxes, scores
+
+
+def suppress_duplicates(boxes: np.ndarray, scores: np.ndarray, iou: float) -> list:
+    """
+    Indices of the boxes kept after non-maximum suppression: of boxes that
+    overlap by at least iou, only the most confident one survives.
+    """
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    order = np.argsort(-scores, kind="stable")
+    keep = []
+    while order.size:
+        best, rest = order[0], order[1:]
+        keep.append(int(best))
+        # Intersection of the best box with all remaining boxes at once
+        width = np.clip(
+            np.minimum(boxes[best, 2], boxes[rest, 2])
+            - np.maximum(boxes[best, 0], boxes[rest, 0]),
+            0,
+            None,
+        )
+        height = np.clip(
+            np.minimum(boxes[best, 3], boxes[rest, 3])
+            - np.maximum(boxes[best, 1], boxes[rest, 1]),
+            0,
+            None,
+        )
+        intersection = width * height
+        union = areas[best] + areas[rest] - intersection
+        overlap = np.divide(
+            intersection, union, out=np.zeros_like(union), where=union > 0
+        )
+        order = rest[overlap < iou]
+    return sorted(keep)
+
+
+def _split(starts: np.ndarray, ends: np.ndarray, tolerance: float) -> list:
+    """
+    Sweep the intervals in order of their start and cut wherever an interval
+    starts after everything before it has ended. Returns index groups.
+    """
+    order = np.argsort(starts, kind="stable")
+    reach = np.maximum.accumulate(ends[order])
+    cuts = np.flatnonzero(starts[order][1:] >= reach[:-1] - tolerance) + 1
+    return np.split(order, cuts)
+
+
+def _build(boxes: np.ndarray, indices: np.ndarray, tolerance: float, leaf):
+    if indices.size == 1:
+        return leaf(int(indices[0]))
+    sub = boxes[indices]
+
+    # Bands stacked top to bottom form a column; side by side, a row
+    for direction, (start, end) in (("col", (1, 3)), ("row", (0, 2))):
+        groups = _split(sub[:, start], sub[:, end], tolerance)
+        if len(groups) > 1:
+            children = [_build(boxes, indices[g], tolerance, leaf) for g in groups]
+            return _merge(direction, children)
+
+    # Boxes overlap in both directions: keep reading order
+    order = np.lexsort((sub[:, 0], sub[:, 1]))
+    return {"type": "col", "children": [leaf(int(i)) for i in indices[order]]}
+
+
+def _merge(direction: str, children: list) -> dict:
+    """Flatten children that run in the same direction as their parent."""
+    merged = []
+    for child in children:
+        if child.get("type") == direction and "children" in child:
+            merged.extend(child["children"])
+        else:
+            merged.append(child)
+    return {"type": direction, "children": merged}
+
+
+def build_layout_tree(
+    elements: list,
+    image_size: tuple | None = None,
+    tolerance: float = OVERLAP_TOLERANCE,
+    duplicate_iou: float = DUPLICATE_IOU,
+) -> dict:
+    """
+    Turn detected elements ({"name", "confidence", "xmin", "ymin", "xmax",
+    "ymax"}) into a tree of "row"/"col" containers via recursive XY cuts.
+    Each leaf records the element type and its width as a percentage of the
+    page, so the tree describes the layout without the image.
+    """
+    if not elements:
+        return {"type": "col", "children": []}
+
+    boxes, scores = _as_arrays(elements)
+    kept = np.array(suppress_duplicates(boxes, scores, duplicate_iou))
+    boxes = boxes[kept]
+    names = [elements[i]["name"] for i in kept]
+
+    if image_size:
+        page_width = float(image_size[0])
+    else:
+        page_width = float(boxes[:, 2].max() - min(boxes[:, 0].min(), 0)) or 1.0
+    # Scale-relative tolerance: a fraction of the typical element's smaller side
+    sizes = np.minimum(boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1])
+    slack = float(np.median(sizes)) * tolerance
+
+    def leaf(i):
+        width = (boxes[i, 2] - boxes[i, 0]) / page_width * 100
+        return {"type": names[i], "width": int(round(min(width, 100)))}
+
+    tree = _build(boxes, np.arange(len(boxes)), slack, leaf)
+    if "children" not in tree:
+        tree = {"type": "col", "children": [tree]}
+    return tree
+
+
+def count_leaves(tree: dict) -> int:
+    if "children" not in tree:
+        return 1
+    return sum(count_leaves(child) for child in tree["children"])
+
+
+def layout_spec(tree: dict) -> str:
+    """
+    Compact JSON form of a layout tree for prompts: containers become
+    {"row": [...]} / {"col": [...]} and leaves "Type:width%".
+    """
+
+    def compact(node):
+        if "children" in node:
+            return {node["type"]: [compact(child) for child in node["children"]]}
+        return f"{node['type']}:{node['width']}%"
+
+    return json.dumps(compact(tree), separators=(",", ":"))
@@ -0,0 +1,198 @@
+"""Content-addressed cache for LLM responses shared by all agents."""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from dotenv import load_dotenv, find_dotenv
+
+load_dotenv(find_dotenv(), override=True)
+
+# "disk", "memory" or "none"
+LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "disk")
+LLM_CACHE_PATH = os.getenv(
+    "LLM_CACHE_PATH", os.path.join(".", ".cache", "llm_cache.sqlite3")
+)
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", 50 * 1024 * 1024))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 1000))
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", 7 * 24 * 60 * 60))
+# Set to "false" to never cache calls made with a non-zero temperature
+LLM_CACHE_NONZERO_TEMPERATURE = (
+    os.getenv("LLM_CACHE_NONZERO_TEMPERATURE", "true").lower() == "true"
+)
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace so that formatting-only differences share an entry."""
+    return " ".join(prompt.split())
+
+
+def make_cache_key(model: str, temperature: float | None, prompt: str) -> str:
+    """Hash (model, temperature, normalized prompt) into a cache key."""
+    payload = json.dumps([model, temperature, normalize_prompt(prompt)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MemoryStore:
+    """In-process LRU store bounded by number of entries."""
+
+    def __init__(self, max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: int):
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class DiskStore:
+    """SQLite-backed LRU store bounded by the total size of cached responses."""
+
+    def __init__(
+        self, path: str = LLM_CACHE_PATH, max_bytes: int = LLM_CACHE_MAX_BYTES
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        parent_dir = os.path.dirname(path)
+        if parent_dir:
+            os.makedirs(parent_dir, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS llm_cache_accessed_at ON llm_cache (accessed_at)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at < now:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute(
+                "UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            return value
+
+    def set(self, key: str, value: str, ttl: int):
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now + ttl, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        """Drop expired entries, then least recently used ones until under max_bytes."""
+        self._conn.execute("DELETE FROM llm_cache WHERE expires_at < ?", (now,))
+        (total,) = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM llm_cache"
+        ).fetchone()
+        if total <= self.max_bytes:
+            return
+
+        rows = self._conn.execute(
+            "SELECT key, size FROM llm_cache ORDER BY accessed_at"
+        ).fetchall()
+        evicted = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM llm_cache WHERE key = ?", evicted)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+
+class LLMCache:
+    """Response cache keyed on (model, temperature, normalized prompt)."""
+
+    def __init__(
+        self,
+        store=None,
+        ttl: int = LLM_CACHE_TTL,
+        cache_nonzero_temperature: bool = LLM_CACHE_NONZERO_TEMPERATURE,
+    ):
+        self.store = store
+        self.ttl = ttl
+        self.cache_nonzero_temperature = cache_nonzero_temperature
+
+    def is_cacheable(self, temperature: float | None) -> bool:
+        if self.store is None:
+            return False
+        return self.cache_nonzero_temperature or not temperature
+
+    def get(self, model: str, temperature: float | None, prompt: str) -> str | None:
+        if not self.is_cacheable(temperature):
+            return None
+        return self.store.get(make_cache_key(model, temperature, prompt))
+
+    def set(self, model: str, temperature: float | None, prompt: str, response: str):
+        if not self.is_cacheable(temperature) or not response:
+            return
+        self.store.set(make_cache_key(model, temperature, prompt), response, self.ttl)
+
+
+_llm_cache = None
+
+
+def get_llm_cache() -> LLMCache:
+    """Return the process-wide LLM cache configured from the environment."""
+    global _llm_cache
+    if _llm_cache is None:
+        if LLM_CACHE_BACKEND == "disk":
+            store = DiskStore()
+        elif LLM_CACHE_BACKEND == "memory":
+            store = MemoryStore()
+        else:
+            store = None
+        _llm_cache = LLMCache(store)
+    return _llm_cache
@@ -0,0 +1,148 @@
+"""Helpers for calling Gemini chat models through the shared key pool and response cache."""
+
+import asyncio
+import itertools
+import threading
+from google import genai
+from langchain_google_genai import ChatGoogleGenerativeAI
+from utils.key_pool import key_pool
+from utils.llm_cache import get_llm_cache
+
+DEFAULT_MODEL = "gemini-2.0-flash"
+DEFAULT_OUTPUT_TOKENS = 2048
+
+# Process-wide registry of clients, so connections stay warm between calls
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_llm(api_key: str, model: str = DEFAULT_MODEL, temperature=0, **params):
+    """Return the pooled ChatGoogleGenerativeAI instance for (key, model, params).
+
+    The client's own retries are disabled because the key pool handles
+    failures: it fails over to another key on rate limits instead of retrying
+    on a throttled one, and retries server errors with backoff.
+    """
+    registry_key = ("chat", api_key, model, temperature, tuple(sorted(params.items())))
+    with _clients_lock:
+        llm = _clients.get(registry_key)
+        if llm is None:
+            llm = ChatGoogleGenerativeAI(
+                google_api_key=api_key,
+                model=model,
+                temperature=temperature,
+                max_retries=0,
+                **params,
+            )
+            _clients[registry_key] = llm
+    return llm
+
+
+def get_genai_client(api_key: str) -> genai.Client:
+    """Return the pooled google-genai client for the given key."""
+    registry_key = ("genai", api_key)
+    with _clients_lock:
+        client = _clients.get(registry_key)
+        if client is None:
+            client = genai.Client(api_key=api_key)
+            _clients[registry_key] = client
+    return client
+
+
+def estimate_tokens(prompt: str, max_output_tokens: int | None = None) -> int:
+    """Rough token estimate of a call, used to reserve quota before it is made."""
+    return len(prompt) // 4 + (max_output_tokens or DEFAULT_OUTPUT_TOKENS)
+
+
+def response_text(response) -> str:
+    """Extract the text from a chat model response."""
+    return getattr(response, "content", None) or getattr(
+        response, "text", str(response)
+    )
+
+
+def response_tokens(response) -> int | None:
+    """Total tokens used by a chat model response, if reported."""
+    usage = getattr(response, "usage_metadata", None) or {}
+    return usage.get("total_tokens")
+
+
+def predict(
+    prompt: str, model: str = DEFAULT_MODEL, temperature=0, cache=True, **params
+) -> str:
+    """
+    Run a prompt on the least loaded key, serving repeated prompts from the
+    cache. This blocks while waiting for quota; use apredict() in async code.
+    """
+    llm_cache = get_llm_cache()
+    if cache:
+        cached = llm_cache.get(model, temperature, prompt)
+        if cached is not None:
+            print(f"⚡ LLM cache hit ({model})")
+            return cached
+
+    response = key_pool.run(
+        lambda key: get_llm(key, model, temperature, **params).invoke(prompt),
+        estimate_tokens(prompt, params.get("max_output_tokens")),
+        usage=response_tokens,
+    )
+    text = response_text(response)
+    if cache:
+        llm_cache.set(model, temperature, prompt, text)
+    return text
+
+
+async def apredict(
+    prompt: str, model: str = DEFAULT_MODEL, temperature=0, cache=True, **params
+) -> str:
+    """Async variant of predict() that does not block the event loop."""
+    llm_cache = get_llm_cache()
+    if cache:
+        cached = llm_cache.get(model, temperature, prompt)
+        if cached is not None:
+            print(f"⚡ LLM cache hit ({model})")
+            return cached
+
+    response = await key_pool.arun(
+        lambda key: get_llm(key, model, temperature, **params).ainvoke(prompt),
+        estimate_tokens(prompt, params.get("max_output_tokens")),
+        usage=response_tokens,
+    )
+    text = response_text(response)
+    if cache:
+        llm_cache.set(model, temperature, prompt, text)
+    return text
+
+
+async def astream(
+    prompt: str, model: str = DEFAULT_MODEL, temperature=0, cache=True, **params
+):
+    """Yield the response text chunk by chunk while the model generates it."""
+    llm_cache = get_llm_cache()
+    if cache:
+        cached = llm_cache.get(model, temperature, prompt)
+        if cached is not None:
+            print(f"⚡ LLM cache hit ({model})")
+            yield cached
+            return
+
+    tokens = estimate_tokens(prompt, params.get("max_output_tokens"))
+    chunks = []
+    for attempt in itertools.count():
+        key = await key_pool.aacquire(tokens)
+        try:
+            llm = get_llm(key, model, temperature, **params)
+            async for chunk in llm.astream(prompt):
+                if chunk.content:
+                    chunks.append(chunk.content)
+                    yield chunk.content
+            break
+        except Exception as e:
+            # Trying again is only possible before anything was sent to the user
+            delay = None if chunks else key_pool.recover(key, e, attempt)
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+
+    if cache:
+        llm_cache.set(model, temperature, prompt, "".join(chunks))
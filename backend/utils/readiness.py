@@ -0,0 +1,37 @@
+"""Polling helpers that wait for an external condition instead of sleeping blindly."""
+
+import time
+import asyncio
+
+
+async def wait_until(
+    predicate,
+    timeout: float = 60,
+    initial_delay: float = 0.5,
+    max_delay: float = 8,
+    factor: float = 2,
+    description: str = "condition",
+) -> bool:
+    """
+    Poll predicate() with exponential backoff until it returns True.
+    Blocking predicates run in a worker thread. Returns False on timeout.
+    """
+    deadline = time.monotonic() + timeout
+    delay = initial_delay
+    attempts = 0
+    while True:
+        attempts += 1
+        if asyncio.iscoroutinefunction(predicate):
+            ready = await predicate()
+        else:
+            ready = await asyncio.to_thread(predicate)
+        if ready:
+            print(f"✅ {description} ready after {attempts} check(s)")
+            return True
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            print(f"⌛ Gave up waiting for {description} after {timeout}s")
+            return False
+        await asyncio.sleep(min(delay, remaining))
+        delay = min(delay * factor, max_delay)
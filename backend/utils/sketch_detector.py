@@ -0,0 +1,169 @@
+"""
+Local CPU pipeline that detects UI elements on a sketch and turns them into a
+compact layout spec, so sketched pages can be generated by the text model.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+from PIL import Image
+from dotenv import load_dotenv, find_dotenv
+from utils.layout_tree import (
+    build_layout_tree,
+    layout_spec,
+    count_leaves,
+    suppress_duplicates,
+)
+
+load_dotenv(find_dotenv(), override=True)
+
+WEIGHTS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "sketch2code",
+    "weights",
+)
+# YOLOv5 detector exported to ONNX; the image path is used while it is missing
+SKETCH_DETECTOR_WEIGHTS = os.getenv(
+    "SKETCH_DETECTOR_WEIGHTS", os.path.join(WEIGHTS_DIR, "sketch_detector.onnx")
+)
+SKETCH_DETECTOR_CLASSES = os.getenv(
+    "SKETCH_DETECTOR_CLASSES", os.path.join(WEIGHTS_DIR, "class.names")
+)
+# Detections below this score are dropped
+SKETCH_DETECTION_THRESHOLD = float(os.getenv("SKETCH_DETECTION_THRESHOLD", 0.25))
+# Mean score a sketch's detections need for the layout to be trusted
+SKETCH_LAYOUT_MIN_CONFIDENCE = float(os.getenv("SKETCH_LAYOUT_MIN_CONFIDENCE", 0.6))
+
+INPUT_SIZE = 640
+NMS_IOU = 0.45
+
+
+class SketchDetector:
+    """YOLOv5 element detector running on onnxruntime's CPU provider."""
+
+    def __init__(self, weights: str, classes: str):
+        import onnxruntime
+
+        self.session = onnxruntime.InferenceSession(
+            weights, providers=["CPUExecutionProvider"]
+        )
+        self.input_name = self.session.get_inputs()[0].name
+        with open(classes, "r") as file:
+            self.classes = [line.strip() for line in file if line.strip()]
+
+    def _letterbox(self, image: Image.Image) -> tuple[np.ndarray, float, tuple]:
+        """Resize keeping the aspect ratio and pad to the square model input."""
+        scale = INPUT_SIZE / max(image.size)
+        width, height = round(image.width * scale), round(image.height * scale)
+        canvas = Image.new("RGB", (INPUT_SIZE, INPUT_SIZE), (114, 114, 114))
+        pad = ((INPUT_SIZE - width) // 2, (INPUT_SIZE - height) // 2)
+        canvas.paste(image.convert("RGB").resize((width, height)), pad)
+        tensor = np.asarray(canvas, dtype=np.float32).transpose(2, 0, 1) / 255.0
+        return tensor[np.newaxis], scale, pad
+
+    def detect(self, path: str) -> tuple[list, tuple]:
+        """Detected elements in the format build_layout_tree expects, and the image size."""
+        with Image.open(path) as image:
+            size = image.size
+            tensor, scale, pad = self._letterbox(image)
+
+        # Rows of (cx, cy, w, h, objectness, class scores...)
+        predictions = self.session.run(None, {self.input_name: tensor})[0][0]
+        class_ids = predictions[:, 5:].argmax(axis=1)
+        scores = (
+            predictions[:, 4] * predictions[np.arange(len(class_ids)), 5 + class_ids]
+        )
+        mask = scores >= SKETCH_DETECTION_THRESHOLD
+        predictions, class_ids, scores = (
+            predictions[mask],
+            class_ids[mask],
+            scores[mask],
+        )
+
+        centers, extents = predictions[:, :2], predictions[:, 2:4] / 2
+        boxes = np.hstack([centers - extents, centers + extents])
+        boxes = (boxes - np.array([*pad, *pad])) / scale
+        boxes = np.clip(boxes, 0, [size[0], size[1], size[0], size[1]])
+
+        elements = []
+        for i in suppress_duplicates(boxes, scores, NMS_IOU):
+            xmin, ymin, xmax, ymax = boxes[i].tolist()
+            elements.append(
+                {
+                    "name": self.classes[class_ids[i]],
+                    "confidence": float(scores[i]),
+                    "xmin": xmin,
+                    "ymin": ymin,
+                    "xmax": xmax,
+                    "ymax": ymax,
+                }
+            )
+        return elements, size
+
+
+_detector = None
+_detector_lock = threading.Lock()
+_layouts = OrderedDict()
+MAX_CACHED_LAYOUTS = 128
+
+
+def get_detector() -> SketchDetector | None:
+    """The shared detector, or None when its weights or onnxruntime are missing."""
+    global _detector
+    with _detector_lock:
+        if _detector is None:
+            if not os.path.exists(SKETCH_DETECTOR_WEIGHTS):
+                _detector = False
+            else:
+                try:
+                    _detector = SketchDetector(
+                        SKETCH_DETECTOR_WEIGHTS, SKETCH_DETECTOR_CLASSES
+                    )
+                except Exception as e:
+                    print(f"⚠️ Sketch detector unavailable: {e}")
+                    _detector = False
+        return _detector or None
+
+
+def sketch_layout(path: str, digest: str) -> dict | None:
+    """
+    Detect the elements of a sketch and build its layout spec. Returns None
+    when there is no detector or the detections are not confident enough,
+    in which case the caller falls back to sending the image itself.
+    Results are cached by the sketch's content hash.
+    """
+    with _detector_lock:
+        if digest in _layouts:
+            _layouts.move_to_end(digest)
+            return _layouts[digest]
+
+    detector = get_detector()
+    if detector is None:
+        return None
+
+    try:
+        elements, size = detector.detect(path)
+    except Exception as e:
+        print(f"⚠️ Sketch detection failed for {os.path.basename(path)}: {e}")
+        return None
+    confidence = float(np.mean([e["confidence"] for e in elements] or [0.0]))
+    if len(elements) < 2 or confidence < SKETCH_LAYOUT_MIN_CONFIDENCE:
+        print(
+            f"   🔍 Low confidence layout for {os.path.basename(path)} "
+            f"({len(elements)} elements, {confidence:.2f})"
+        )
+        result = None
+    else:
+        tree = build_layout_tree(elements, size)
+        result = {
+            "spec": layout_spec(tree),
+            "elements": count_leaves(tree),
+            "confidence": confidence,
+        }
+
+    with _detector_lock:
+        _layouts[digest] = result
+        while len(_layouts) > MAX_CACHED_LAYOUTS:
+            _layouts.popitem(last=False)
+    return result
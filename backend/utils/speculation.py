@@ -0,0 +1,71 @@
+"""Speculative execution of the next pipeline stage while the user reviews the current one."""
+
+import json
+import asyncio
+import hashlib
+
+
+def fingerprint(inputs) -> str:
+    """Hash the inputs a speculative result was computed from."""
+    payload = json.dumps(inputs, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SpeculativeExecutor:
+    """
+    Starts the likely next stage in the background, keyed by (chat, stage).
+    A result is only handed out if it was computed from the same inputs the
+    stage is about to use; otherwise it is thrown away.
+    """
+
+    def __init__(self):
+        self._tasks = {}
+
+    def start(self, chat_id, stage: str, inputs, func, *args):
+        """Run func(*args) in the background. Sync functions run in a worker thread."""
+        key = (str(chat_id), stage)
+        digest = fingerprint(inputs)
+
+        existing = self._tasks.get(key)
+        if existing and existing[0] == digest:
+            return
+        self.discard(chat_id, stage)
+
+        if asyncio.iscoroutinefunction(func):
+            task = asyncio.create_task(func(*args))
+        else:
+            task = asyncio.create_task(asyncio.to_thread(func, *args))
+        task.add_done_callback(self._log_failure)
+        self._tasks[key] = (digest, task)
+        print(f"🔮 Speculatively running '{stage}' for chat {chat_id}")
+
+    async def take(self, chat_id, stage: str, inputs):
+        """Commit a speculative result, waiting for it if still running. None on miss."""
+        entry = self._tasks.pop((str(chat_id), stage), None)
+        if entry is None:
+            return None
+
+        digest, task = entry
+        if digest != fingerprint(inputs):
+            task.cancel()
+            return None
+        try:
+            result = await task
+        except (Exception, asyncio.CancelledError):
+            return None
+        print(f"🔮 Using speculative result of '{stage}' for chat {chat_id}")
+        return result
+
+    def discard(self, chat_id, stage: str):
+        """Drop a speculative result, cancelling it if it is still running."""
+        entry = self._tasks.pop((str(chat_id), stage), None)
+        if entry:
+            entry[1].cancel()
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task):
+        if not task.cancelled() and task.exception():
+            print(f"Speculative task failed: {task.exception()}")
+
+
+speculative_executor = SpeculativeExecutor()
@@ -1,22 +1,25 @@
-import json
+import contextvars
 from datetime import datetime
-import asyncio
+from channels.layers import get_channel_layer
 
+# Chat whose terminal receives logs emitted by the current task
+current_chat_id = contextvars.ContextVar("current_chat_id", default=None)
 
-class TerminalLogger:
-    _websocket = None
 
-    @classmethod
-    def set_websocket(cls, websocket):
-        cls._websocket = websocket
+class TerminalLogger:
+    @staticmethod
+    def group_name(chat_id):
+        return f"terminal_{chat_id}"
 
     @classmethod
-    def clear_websocket(cls):
-        cls._websocket = None
+    def bind(cls, chat_id):
+        """Route logs of the current task (and tasks it spawns) to a chat's terminal."""
+        current_chat_id.set(chat_id)
 
     @classmethod
-    async def log(cls, log_type, category, message):
-        if not cls._websocket:
+    async def log(cls, log_type, category, message, chat_id=None):
+        chat_id = chat_id or current_chat_id.get()
+        if not chat_id:
             print(f"[{category.upper()}] ({log_type.upper()}) {message}")
             return
 
@@ -27,4 +30,6 @@ class TerminalLogger:
             "category": category,
             "message": message,
         }
-        await cls._websocket.send(text_data=json.dumps(payload))
+        await get_channel_layer().group_send(
+            cls.group_name(chat_id), {"type": "terminal.log", "payload": payload}
+        )
@@ -8,6 +8,21 @@ def extract_filename(prompt: str) -> str:
     return match.group(0) if match else None
 
 
+def page_filename(name: str) -> str | None:
+    """
+    HTML filename of a page, e.g. "About Us" -> "About-Us.html". Returns None
+    for names that are empty or look like paths, so a page can never be
+    written or deleted outside the project directory.
+    """
+    if not isinstance(name, str) or "/" in name or "\\" in name or ".." in name:
+        return None
+    slug = re.sub(r"[^\w-]+", "-", name.strip().removesuffix(".html"))
+    slug = re.sub(r"-{2,}", "-", slug).strip("-")
+    if not re.fullmatch(r"\w+(?:-\w+)*", slug):
+        return None
+    return f"{slug}.html"
+
+
 def extract_json_from_text(text):
     code_block_pattern = r"```(?:json)?(.*?)```"
     code_blocks = re.findall(code_block_pattern, text, re.DOTALL)
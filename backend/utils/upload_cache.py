@@ -0,0 +1,133 @@
+"""Reuse of Gemini file uploads for sketch images that have not changed."""
+
+import io
+import os
+import asyncio
+import hashlib
+import datetime
+from PIL import Image
+from dotenv import load_dotenv, find_dotenv
+
+load_dotenv(find_dotenv(), override=True)
+
+# Longest side, in pixels, a sketch is scaled down to before upload
+SKETCH_MAX_DIMENSION = int(os.getenv("SKETCH_MAX_DIMENSION", 1536))
+# Images at or below this size and dimension are uploaded as they are
+SKETCH_MAX_BYTES = int(os.getenv("SKETCH_MAX_BYTES", 1024 * 1024))
+SKETCH_JPEG_QUALITY = int(os.getenv("SKETCH_JPEG_QUALITY", 85))
+
+# Stop reusing an upload this long before the API expires it
+EXPIRY_MARGIN = datetime.timedelta(minutes=10)
+# Uploaded files are kept for 48 hours when the API does not say otherwise
+DEFAULT_FILE_LIFETIME = datetime.timedelta(hours=48)
+
+MIME_TYPES = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".webp": "image/webp",
+}
+
+
+def compress_image(original: bytes, path: str) -> tuple[bytes, str]:
+    """
+    Scale an image down and recompress it as JPEG when it is larger than
+    needed. Returns (data, mime type).
+    """
+    mime_type = MIME_TYPES.get(os.path.splitext(path)[1].lower(), "image/png")
+
+    with Image.open(io.BytesIO(original)) as image:
+        if (
+            len(original) <= SKETCH_MAX_BYTES
+            and max(image.size) <= SKETCH_MAX_DIMENSION
+        ):
+            return original, mime_type
+
+        image.thumbnail((SKETCH_MAX_DIMENSION, SKETCH_MAX_DIMENSION))
+        if image.mode in ("RGBA", "LA", "P"):
+            # Sketches are drawn on white; flatten transparency onto it
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, "white")
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        buffer = io.BytesIO()
+        image.convert("RGB").save(
+            buffer, "JPEG", quality=SKETCH_JPEG_QUALITY, optimize=True
+        )
+
+    print(
+        f"🗜️ Compressed {os.path.basename(path)}: "
+        f"{len(original) // 1024} KB -> {buffer.tell() // 1024} KB"
+    )
+    return buffer.getvalue(), "image/jpeg"
+
+
+def read_image(path: str) -> tuple[bytes, str]:
+    """Read an image and the sha256 of its content."""
+    with open(path, "rb") as file:
+        original = file.read()
+    return original, hashlib.sha256(original).hexdigest()
+
+
+class UploadCache:
+    """
+    Remote file handles keyed on (API key, image sha256). Files uploaded with
+    one key are not visible to another, so each key gets its own upload.
+    Concurrent requests for the same image share a single upload.
+    """
+
+    def __init__(self):
+        self._uploads = {}
+
+    async def upload(self, client, api_key: str, path: str):
+        """Return a file handle for the image, uploading it only when needed."""
+        original, digest = await asyncio.to_thread(read_image, path)
+        key = (api_key, digest)
+
+        entry = self._uploads.get(key)
+        if entry is not None and self._usable(*entry):
+            print(f"♻️ Reusing uploaded sketch {os.path.basename(path)}")
+            return await asyncio.shield(entry[0])
+
+        task = asyncio.ensure_future(self._upload(client, original, path))
+        self._uploads[key] = (task, self._now() + DEFAULT_FILE_LIFETIME)
+        try:
+            image_file = await asyncio.shield(task)
+        except Exception:
+            self._uploads.pop(key, None)
+            raise
+
+        expires_at = getattr(image_file, "expiration_time", None)
+        if expires_at is not None:
+            if expires_at.tzinfo is None:
+                expires_at = expires_at.replace(tzinfo=datetime.timezone.utc)
+            self._uploads[key] = (task, expires_at)
+        return image_file
+
+    @staticmethod
+    async def _upload(client, original: bytes, path: str):
+        data, mime_type = await asyncio.to_thread(compress_image, original, path)
+        return await client.aio.files.upload(
+            file=io.BytesIO(data), config={"mime_type": mime_type}
+        )
+
+    def invalidate(self, api_key: str, image_file):
+        """Forget an upload the API no longer accepts."""
+        for key, (task, expires_at) in list(self._uploads.items()):
+            if key[0] == api_key and task.done() and self._usable(task, expires_at):
+                if task.result() is image_file:
+                    del self._uploads[key]
+
+    def _usable(self, task: asyncio.Future, expires_at: datetime.datetime) -> bool:
+        if not task.done():
+            return True
+        if task.cancelled() or task.exception():
+            return False
+        return expires_at > self._now() + EXPIRY_MARGIN
+
+    @staticmethod
+    def _now() -> datetime.datetime:
+        return datetime.datetime.now(datetime.timezone.utc)
+
+
+upload_cache = UploadCache()
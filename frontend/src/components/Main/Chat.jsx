@@ -5,7 +5,12 @@ import ChatMessage from "./ChatMessage";
 import ChatInput from "./ChatInput";
 import api from "../../api";
 import { API_ENDPOINTS } from "../../constants";
-import { setStage, setPages } from "../../store/slices/projectSlice";
+import {
+  setStage,
+  setPages,
+  setPreviewUrl,
+  setDeployStatus,
+} from "../../store/slices/projectSlice";
 import { setCurrentChatId } from "../../store/slices/chatSlice";
 import StageInfo from "./StageInfo";
 import DevelopmentPagesList from "./DevelopmentPagesList";
@@ -15,6 +20,15 @@ import PreviewImages from "./PreviewImages";
 
 let socket;
 
+// Milliseconds to wait before reconnecting a dropped WebSocket
+const RECONNECT_DELAY = 2000;
+
+const toChatMessage = (msg) => ({
+  text: msg.content,
+  isUser: msg.sender !== "assistant",
+  synced: true,
+});
+
 const Chat = () => {
   const [messages, setMessages] = useState([]);
   const [isLoading, setIsLoading] = useState(false);
@@ -29,6 +43,12 @@ const Chat = () => {
   const initialMessage = location.state?.initialMessage;
   const [showPreviewImages, setShowPreviewImages] = useState(false);
   const [images, setImages] = useState([]);
+  // Cursor of the oldest loaded message, to page back through history
+  const [olderCursor, setOlderCursor] = useState(null);
+  // Cursor of the newest synced message, to fetch only what is new on reconnect
+  const syncCursorRef = useRef(null);
+  const closingRef = useRef(false);
+  const initialMessageSentRef = useRef(false);
 
   useEffect(() => {
     const initializeChat = async () => {
@@ -38,12 +58,9 @@ const Chat = () => {
         if (savedChatId) {
           dispatch(setCurrentChatId(savedChatId));
           const response = await api.get(API_ENDPOINTS.MESSAGES(savedChatId));
-          setMessages(
-            response.data.map((msg) => ({
-              text: msg.content,
-              isUser: msg.sender !== "assistant",
-            })),
-          );
+          setMessages(response.data.results.map(toChatMessage));
+          setOlderCursor(response.data.previous);
+          syncCursorRef.current = response.data.next;
           setupWebSocket(savedChatId);
         } else {
           createNewChat();
@@ -79,10 +96,57 @@ const Chat = () => {
 
     initializeChat();
     return () => {
+      closingRef.current = true;
       if (socket) socket.close();
     };
   }, []);
 
+  const loadOlderMessages = async () => {
+    if (!olderCursor) return;
+    const response = await api.get(API_ENDPOINTS.MESSAGES(currentChatId), {
+      params: { before: olderCursor },
+    });
+    setMessages((prev) => [...response.data.results.map(toChatMessage), ...prev]);
+    setOlderCursor(response.data.previous);
+  };
+
+  // Fetch only the messages saved since the last sync, e.g. while disconnected
+  const syncNewMessages = async (chatId) => {
+    let fetched = [];
+    let hasMore = true;
+    while (hasMore) {
+      const params = syncCursorRef.current ? { since: syncCursorRef.current } : {};
+      const response = await api.get(API_ENDPOINTS.MESSAGES(chatId), { params });
+      fetched = fetched.concat(response.data.results.map(toChatMessage));
+      syncCursorRef.current = response.data.next;
+      hasMore = syncCursorRef.current !== null && response.data.has_more;
+    }
+
+    setMessages((prev) => {
+      // Unfinished streams are replaced by their saved version
+      const kept = prev.filter((msg) => !msg.streamId && !msg.isLoading);
+      const loading = prev.filter((msg) => msg.isLoading);
+      // Messages shown live since the last sync are the first ones fetched
+      const known = kept.filter((msg) => !msg.synced).length;
+      return [
+        ...kept.map((msg) => ({ ...msg, synced: true })),
+        ...fetched.slice(known),
+        ...loading,
+      ];
+    });
+  };
+
+  const reconnect = async (chatId) => {
+    if (closingRef.current) return;
+    try {
+      await syncNewMessages(chatId);
+      setupWebSocket(chatId);
+    } catch (err) {
+      console.error("Reconnect failed:", err);
+      setTimeout(() => reconnect(chatId), RECONNECT_DELAY);
+    }
+  };
+
   // 👇 Establish websocket connection
   const setupWebSocket = (chatId) => {
     const token = localStorage.getItem("access");
@@ -91,7 +155,8 @@ const Chat = () => {
 
     socket.onopen = () => {
       console.log("WebSocket connected");
-      if (initialMessage) {
+      if (initialMessage && !initialMessageSentRef.current) {
+        initialMessageSentRef.current = true;
         handleSend(initialMessage);
         window.history.replaceState({}, document.title);
       }
@@ -100,6 +165,54 @@ const Chat = () => {
     socket.onmessage = (event) => {
       const data = JSON.parse(event.data);
       console.log("WS Message", data);
+      const stream = data.stream;
+
+      // Status updates of the background job processing the user's message
+      if (data.job) {
+        if (data.job.status === "failed" || data.job.status === "cancelled") {
+          // Also drop replies that were still streaming when the job stopped
+          setMessages((prev) => prev.filter((msg) => !msg.isLoading && !msg.streamId));
+          setIsLoading(false);
+          if (data.job.status === "failed") {
+            setError("Something went wrong while processing your message.");
+          }
+        }
+        return;
+      }
+
+      // Deploy state transitions, pushed instead of polled
+      if (data.deploy) {
+        dispatch(setDeployStatus(data.deploy.status));
+        if (data.deploy.deployed_url) {
+          dispatch(setPreviewUrl(data.deploy.deployed_url));
+        }
+        return;
+      }
+
+      // Streamed responses arrive as start/delta frames followed by the full message
+      if (stream?.event === "start") {
+        setMessages((prev) => [
+          ...prev.filter((msg) => !msg.isLoading),
+          { text: "", isUser: false, streamId: stream.id },
+        ]);
+        if (data.project_stage) {
+          dispatch(setStage(data.project_stage));
+        }
+        return;
+      }
+      if (stream?.event === "error") {
+        setMessages((prev) => prev.filter((msg) => msg.streamId !== stream.id));
+        return;
+      }
+      if (stream?.event === "delta") {
+        setMessages((prev) =>
+          prev.map((msg) =>
+            msg.streamId === stream.id ? { ...msg, text: msg.text + data.delta } : msg,
+          ),
+        );
+        return;
+      }
+
       const extra_details = data.extra_details || {};
 
       const newMessage = {
@@ -123,7 +236,10 @@ const Chat = () => {
         setImages(extra_details.stage_data.images);
       }
 
-      setMessages((prev) => [...prev.filter((msg) => !msg.isLoading), newMessage]);
+      setMessages((prev) => [
+        ...prev.filter((msg) => !msg.isLoading && (!stream || msg.streamId !== stream.id)),
+        newMessage,
+      ]);
 
       setIsLoading(false);
       if (data.project_stage) {
@@ -138,6 +254,9 @@ const Chat = () => {
 
     socket.onclose = () => {
       console.log("WebSocket closed");
+      if (!closingRef.current) {
+        setTimeout(() => reconnect(chatId), RECONNECT_DELAY);
+      }
     };
   };
 
@@ -227,6 +346,13 @@ const Chat = () => {
         </div>
       )}
       <div className="flex-1 overflow-y-auto p-4">
+        {olderCursor && (
+          <div className="flex justify-center mb-2">
+            <button className="text-sm text-blue-500" onClick={loadOlderMessages}>
+              Load earlier messages
+            </button>
+          </div>
+        )}
         {messages.map((msg, index) => (
           <div key={index}>
             {msg.specialComponent === "developmentPagesList" && (
@@ -2,38 +2,46 @@ import React, { useState, useEffect } from "react";
 import { Globe, RefreshCw, ExternalLink } from "lucide-react";
 import { useDispatch, useSelector } from "react-redux";
 import api from "../../api";
-import { setPreviewUrl } from "../../store/slices/projectSlice";
+import { setPreviewUrl, setDeployStatus } from "../../store/slices/projectSlice";
 import { API_ENDPOINTS } from "../../constants";
 
+const DEPLOY_STATUS_LABELS = {
+  queued: "Deployment queued...",
+  pushing: "Pushing code to GitHub...",
+  pages_building: "GitHub Pages is building the site...",
+  failed: "Deployment failed.",
+};
+
 const Preview = () => {
   const projectStage = useSelector((state) => state.project.stage);
   const previewUrl = useSelector((state) => state.project.previewUrl);
+  const deployStatus = useSelector((state) => state.project.deployStatus);
   const dispatch = useDispatch();
   const currentChatId = useSelector((state) => state.chat.currentChatId);
 
+  // Load the current deploy state once; later transitions are pushed over the chat socket
   useEffect(() => {
-    let interval = null;
-    console.log(projectStage);
+    if (!currentChatId || previewUrl) return;
+    if (projectStage !== "Deployment" && projectStage !== "Complete") return;
 
-    if (projectStage === "Deploy" || projectStage === "Complete") {
-      const fetchPreviewUrl = async () => {
-        try {
-          const response = await api.get(API_ENDPOINTS.PREVIEW_URL(currentChatId));
-          const deployedUrl = response.data.deployed_url;
-          if (deployedUrl) {
-            dispatch(setPreviewUrl(deployedUrl));
-            clearInterval(interval);
-          }
-        } catch (error) {
-          console.error("Error fetching deployed URL:", error);
+    const fetchDeployState = async () => {
+      try {
+        const response = await api.get(API_ENDPOINTS.PREVIEW_URL(currentChatId));
+        if (response.data.deploy_status) {
+          dispatch(setDeployStatus(response.data.deploy_status));
         }
-      };
-
-      interval = setInterval(fetchPreviewUrl, 5000);
+        if (response.data.deployed_url) {
+          dispatch(setPreviewUrl(response.data.deployed_url));
+        }
+      } catch (error) {
+        console.error("Error fetching deployed URL:", error);
+      }
+    };
+    fetchDeployState();
+  }, [projectStage, currentChatId, previewUrl, dispatch]);
 
-      return () => clearInterval(interval);
-    }
-  }, [projectStage, currentChatId, dispatch]);
+  // A first Pages build serves a 404 until it finishes
+  const isLive = previewUrl && deployStatus !== "pages_building";
 
   const handleRefresh = () => {
     const iframe = document.getElementById("preview-iframe");
@@ -47,7 +55,7 @@ const Preview = () => {
       <div className="flex items-center p-2">
         <Globe className="mr-2" />
         <div className="flex-grow border rounded px-2 py-1 mr-2">
-          {previewUrl || "Waiting for deployment..."}
+          {previewUrl || DEPLOY_STATUS_LABELS[deployStatus] || "Waiting for deployment..."}
         </div>
         <button
           onClick={handleRefresh}
@@ -69,7 +77,7 @@ const Preview = () => {
       </div>
 
       <div className="flex-grow overflow-hidden">
-        {previewUrl ? (
+        {isLive ? (
           <iframe
             id="preview-iframe"
             src={previewUrl}
@@ -78,7 +86,9 @@ const Preview = () => {
           />
         ) : (
           <div className="w-full h-full flex items-center justify-center text-gray-500">
-            Preview will be available after deployment.
+            {previewUrl
+              ? DEPLOY_STATUS_LABELS.pages_building
+              : "Preview will be available after deployment."}
           </div>
         )}
       </div>
@@ -72,14 +72,18 @@ export default function SketchCanvas({ open, onClose, fileName }) {
     offscreenCtx.fillRect(0, 0, canvas.width, canvas.height);
     offscreenCtx.drawImage(canvas, 0, 0);
 
-    const imageData = offscreenCanvas.toDataURL("image/png");
+    const imageBlob = await new Promise((resolve) =>
+      offscreenCanvas.toBlob(resolve, "image/png"),
+    );
 
     try {
-      const uploadRes = await api.post("/api/upload-sketch/", {
-        image: imageData,
-        chat_id: currentChatId,
-        file_name: fileName,
-      });
+      // Sent as a binary multipart upload rather than a base64 data URL
+      const formData = new FormData();
+      formData.append("chat_id", currentChatId);
+      formData.append("file_name", fileName);
+      formData.append("image", imageBlob, `${fileName}.png`);
+
+      const uploadRes = await api.post("/api/upload-sketch/", formData);
 
       const designPath = uploadRes.data.filepath;
       console.log("Response:", designPath);
@@ -1,14 +1,18 @@
 import React, { useState, useEffect, useRef } from "react";
 import { Terminal as TerminalIcon } from "lucide-react";
+import { useSelector } from "react-redux";
 
 const Terminal = () => {
   const [logs, setLogs] = useState([]);
   const terminalRef = useRef(null);
   const websocketRef = useRef(null);
+  const currentChatId = useSelector((state) => state.chat.currentChatId);
 
   useEffect(() => {
+    if (!currentChatId) return;
+
     const apiUrl = import.meta.env.VITE_API_URL.replace(/^http/, "ws");
-    const socket = new WebSocket(`${apiUrl}/ws/terminal/`);
+    const socket = new WebSocket(`${apiUrl}/ws/terminal/${currentChatId}/`);
     websocketRef.current = socket;
 
     socket.onopen = () => {
@@ -34,7 +38,7 @@ const Terminal = () => {
     return () => {
       socket.close();
     };
-  }, []);
+  }, [currentChatId]);
 
   useEffect(() => {
     if (terminalRef.current) {
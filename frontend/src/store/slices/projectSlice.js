@@ -3,6 +3,8 @@ import { createSlice } from "@reduxjs/toolkit";
 const initialState = {
   stage: "Init",
   previewUrl: null,
+  // Deploy state pushed by the server: queued, pushing, pages_building, live or failed
+  deployStatus: null,
   pages: [],
 };
 
@@ -16,11 +18,15 @@ const projectSlice = createSlice({
     setPreviewUrl: (state, action) => {
       state.previewUrl = action.payload;
     },
+    setDeployStatus: (state, action) => {
+      state.deployStatus = action.payload;
+    },
     setPages: (state, action) => {
       state.pages = action.payload;
     },
   },
 });
 
-export const { setStage, setPreviewUrl, setPages } = projectSlice.actions;
+export const { setStage, setPreviewUrl, setDeployStatus, setPages } =
+  projectSlice.actions;
 export default projectSlice.reducer;